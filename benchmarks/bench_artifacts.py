@@ -0,0 +1,99 @@
+"""Model artifact download throughput over a real socket: the previous StreamingResponse endpoint vs the current one"""
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+uvicorn = pytest.importorskip("uvicorn")
+import requests  # noqa: E402
+from fastapi import FastAPI  # noqa: E402
+from fastapi.responses import StreamingResponse  # noqa: E402
+
+from bench_startup import CONTROL_PLANE_DIR  # noqa: E402
+from conftest import record_rate  # noqa: E402
+
+sys.path.insert(0, str(CONTROL_PLANE_DIR))
+from api.routers import models  # noqa: E402
+
+ARTIFACT_BYTES = 64 * 1024 * 1024
+HEADERS = {"x-api-key": "aurora-internal-key"}
+
+
+@pytest.fixture(scope="module")
+def server(tmp_path_factory):
+    root = tmp_path_factory.mktemp("shared-models")
+    version = root / "housing" / "versions" / "v1"
+    version.mkdir(parents=True)
+    (version / "model.pkl").write_bytes(os.urandom(ARTIFACT_BYTES))
+
+    previous_root = models.ROOT
+    models.ROOT = root
+
+    app = FastAPI()
+    app.include_router(models.router)
+
+    @app.get("/legacy/{model}/{ref}/artifact")
+    def legacy_artifact(model: str, ref: str):
+        # The endpoint as it was: Python-level iteration over an unclosed file object
+        file = models.resolve(model, ref) / "model.pkl"
+        return StreamingResponse(file.open("rb"), media_type="application/octet-stream")
+
+    config = uvicorn.Config(app, host="127.0.0.1", port=0, log_level="warning")
+    instance = uvicorn.Server(config)
+    thread = threading.Thread(target=instance.run, daemon=True)
+    thread.start()
+    while not instance.started:
+        time.sleep(0.01)
+    port = instance.servers[0].sockets[0].getsockname()[1]
+
+    yield f"http://127.0.0.1:{port}"
+    instance.should_exit = True
+    thread.join()
+    models.ROOT = previous_root
+
+
+def download(session, url, headers=None) -> int:
+    received = 0
+    with session.get(url, headers={**HEADERS, **(headers or {})}, stream=True) as response:
+        response.raise_for_status()
+        for chunk in response.iter_content(1024 * 1024):
+            received += len(chunk)
+    return received
+
+
+@pytest.mark.parametrize("endpoint", ["legacy", "models"])
+def bench_full_download(benchmark, server, endpoint):
+    session = requests.Session()
+    url = f"{server}/{endpoint}/housing/v1/artifact"
+    assert benchmark.pedantic(download, args=(session, url), rounds=5, warmup_rounds=1) == ARTIFACT_BYTES
+    record_rate(benchmark, "mib_per_second", ARTIFACT_BYTES / 2**20)
+
+
+@pytest.mark.parametrize("parts", [4, 8])
+def bench_parallel_ranges(benchmark, server, parts):
+    url = f"{server}/models/housing/v1/artifact"
+    step = -(-ARTIFACT_BYTES // parts)
+    sessions = [requests.Session() for _ in range(parts)]
+
+    def fetch_all():
+        with ThreadPoolExecutor(parts) as pool:
+            sizes = pool.map(
+                lambda i: download(sessions[i], url, {"Range": f"bytes={i * step}-{min((i + 1) * step, ARTIFACT_BYTES) - 1}"}),
+                range(parts),
+            )
+            return sum(sizes)
+
+    assert benchmark.pedantic(fetch_all, rounds=5, warmup_rounds=1) == ARTIFACT_BYTES
+    record_rate(benchmark, "mib_per_second", ARTIFACT_BYTES / 2**20)
+
+
+def bench_revalidate_unchanged(benchmark, server):
+    session = requests.Session()
+    url = f"{server}/models/housing/v1/artifact"
+    etag = session.head(url, headers=HEADERS).headers["etag"]
+
+    response = benchmark(session.get, url, headers={**HEADERS, "If-None-Match": etag})
+    assert response.status_code == 304
@@ -0,0 +1,46 @@
+"""decide_replicas throughput with the history ring buffer empty, partly filled and full"""
+import pytest
+
+from decision import CostAwareDecisionEngine
+from history import HISTORY_CAPACITY
+
+START = 1_700_000_000.0
+INTERVAL = 60.0
+
+
+class StepClock:
+    """Advances one control-loop interval per call to decide_replicas"""
+
+    def __init__(self):
+        self.now = START
+
+    def __call__(self):
+        return self.now
+
+
+def warmed_engine(samples: int):
+    clock = StepClock()
+    engine = CostAwareDecisionEngine(clock=clock)
+    for i in range(samples):
+        clock.now = START + i * INTERVAL
+        engine.decide_replicas(3, 0.5 + 0.2 * ((i % 60) / 60))
+    return engine, clock
+
+
+@pytest.mark.parametrize("history", [0, 1_000, HISTORY_CAPACITY])
+def bench_decide_replicas(benchmark, history):
+    engine, clock = warmed_engine(history)
+
+    def decide():
+        clock.now += INTERVAL
+        return engine.decide_replicas(3, 0.6, {"request_rate": 10.0})
+
+    benchmark.extra_info["history_samples"] = len(engine.history)
+    benchmark(decide)
+
+
+@pytest.mark.parametrize("forecaster", ["trend", "ewma", "linear", "holt_winters"])
+def bench_predict_future_load(benchmark, forecaster):
+    engine, _ = warmed_engine(HISTORY_CAPACITY)
+    engine.policies["default"]["forecaster"] = forecaster
+    benchmark(engine.predict_future_load, 0.6)
@@ -0,0 +1,71 @@
+"""/predict latency and throughput through an in-process TestClient with a locally trained RandomForest"""
+import numpy as np
+import pytest
+
+pytest.importorskip("mlflow", reason="the inference runtime imports mlflow at module level")
+from fastapi.testclient import TestClient  # noqa: E402
+from sklearn.ensemble import RandomForestRegressor  # noqa: E402
+
+from conftest import record_rate  # noqa: E402
+from app import main as runtime  # noqa: E402
+from app.codec import TENSOR_CONTENT_TYPE, encode_tensor  # noqa: E402
+from app.predictors import select_predictor  # noqa: E402
+
+BATCH_SIZES = [1, 8, 64, 512, 4096]
+N_FEATURES = 8
+
+
+@pytest.fixture(scope="module")
+def client():
+    # Same shape as the trainer's model; no MLflow round trip, startup hooks are not run
+    rng = np.random.RandomState(42)
+    X = rng.rand(20_000, N_FEATURES)
+    model = RandomForestRegressor(n_estimators=50, random_state=42).fit(X, rng.rand(len(X)))
+
+    runtime.install_model(runtime.ServingModel(model=model, version="bench"))
+    yield TestClient(runtime.app), model
+    runtime.serving = None
+
+
+def rows(batch: int) -> np.ndarray:
+    return np.random.RandomState(batch).rand(batch, N_FEATURES)
+
+
+def record_throughput(benchmark, batch: int):
+    benchmark.extra_info["batch_size"] = batch
+    record_rate(benchmark, "rows_per_second", batch)
+
+
+@pytest.mark.parametrize("batch", BATCH_SIZES)
+def bench_predict_json(benchmark, client, batch):
+    http, _ = client
+    payload = {"inputs": rows(batch).tolist()}
+    params = {"api_key": runtime.API_KEY}
+
+    response = benchmark(http.post, "/predict", json=payload, params=params)
+    assert response.status_code == 200
+    record_throughput(benchmark, batch)
+
+
+@pytest.mark.parametrize("batch", BATCH_SIZES)
+def bench_predict_tensor(benchmark, client, batch):
+    http, _ = client
+    body, headers = encode_tensor(rows(batch))
+    headers = {**headers, "content-type": TENSOR_CONTENT_TYPE, "accept": TENSOR_CONTENT_TYPE}
+    params = {"api_key": runtime.API_KEY}
+
+    response = benchmark(http.post, "/predict", content=body, headers=headers, params=params)
+    assert response.status_code == 200
+    record_throughput(benchmark, batch)
+
+
+@pytest.mark.parametrize("backend", ["sklearn", "compiled"])
+@pytest.mark.parametrize("batch", BATCH_SIZES)
+def bench_model_predict(benchmark, client, backend, batch):
+    """The model call alone, to separate HTTP/codec overhead from inference"""
+    _, model = client
+    predictor = select_predictor(model, backend)
+    X = rows(batch)
+
+    benchmark(predictor.predict, X)
+    record_throughput(benchmark, batch)
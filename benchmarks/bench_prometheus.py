@@ -0,0 +1,82 @@
+"""Query round trip and result parsing for large Prometheus vectors, against a local stub server"""
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+import prometheus_query
+
+SERIES = [100, 1_000, 10_000]
+
+
+def vector(n: int, grouped_by: str) -> bytes:
+    """An instant vector of n series labelled like the batched queries' results"""
+    result = []
+    for i in range(n):
+        if grouped_by == "deployment":
+            labels = {"namespace": f"ns-{i % 10}", "deployment": f"model-{i}"}
+        else:
+            labels = {"namespace": f"ns-{(i // 4) % 10}", "pod": f"model-{i // 4}-5d8f9c7b6-{i % 4:05d}"}
+        result.append({"metric": labels, "value": [1_700_000_000.0, str(0.25 + (i % 50) / 100)]})
+    return json.dumps({"status": "success", "data": {"resultType": "vector", "result": result}}).encode()
+
+
+@pytest.fixture(scope="module")
+def prometheus():
+    """Stub serving a pre-encoded vector; the response size is chosen by the 'series' query param"""
+    bodies = {
+        (n, grouping): vector(n, grouping)
+        for n in SERIES for grouping in ("deployment", "pod")
+    }
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+        wbufsize = 1 << 16  # one write per response; split header/body writes stall on delayed ACKs
+
+        def log_message(self, *args):
+            pass
+
+        def do_GET(self):
+            query = self.path.split("query=", 1)[-1]
+            n, grouping = query.split("-", 1)
+            body = bodies[(int(n), grouping)]
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    previous = prometheus_query.PROM_URL
+    prometheus_query.PROM_URL = f"http://127.0.0.1:{server.server_address[1]}"
+    yield
+    prometheus_query.PROM_URL = previous
+    server.shutdown()
+
+
+def keys_for(n: int, grouping: str):
+    count = n if grouping == "deployment" else n // 4
+    return [(f"ns-{i % 10}", f"model-{i}") for i in range(count)]
+
+
+@pytest.mark.parametrize("grouping", ["deployment", "pod"])
+@pytest.mark.parametrize("series", SERIES)
+def bench_query_and_split(benchmark, prometheus, series, grouping):
+    keys = keys_for(series, grouping)
+
+    def fetch():
+        results = prometheus_query.query(f"{series}-{grouping}")
+        return prometheus_query.split_by_target(results, keys)
+
+    per_target = benchmark(fetch)
+    assert len(per_target) == len(keys)
+
+
+@pytest.mark.parametrize("series", SERIES)
+def bench_split_by_target(benchmark, series):
+    results = json.loads(vector(series, "pod"))["data"]["result"]
+    keys = keys_for(series, "pod")
+    benchmark(prometheus_query.split_by_target, results, keys)
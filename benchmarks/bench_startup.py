@@ -0,0 +1,88 @@
+"""Cold start: a fresh interpreter importing each service, and the control-plane API's first Kubernetes call"""
+import json
+import os
+import subprocess
+import sys
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from conftest import ROOT, SCALER_DIR
+
+CONTROL_PLANE_DIR = ROOT / "k8s/workloads/aurora/platform/control-plane"
+
+# (working directory, module) of each service's entry point
+ENTRY_POINTS = {
+    "scaler": (SCALER_DIR, "main"),
+    "control_plane_api": (CONTROL_PLANE_DIR, "api.main"),
+}
+
+FIRST_REQUEST = """
+from fastapi.testclient import TestClient
+import api.main
+# Entering the client runs startup (initial lists) and leaving it stops the watches
+with TestClient(api.main.app) as client:
+    response = client.get("/cluster/nodes", headers={"x-api-key": "aurora-internal-key"})
+assert response.status_code == 200, response.text
+"""
+
+NODES = json.dumps({
+    "kind": "NodeList", "apiVersion": "v1", "metadata": {"resourceVersion": "1"},
+    "items": [
+        {"metadata": {"name": f"node-{i}"}, "status": {"conditions": [{"type": "Ready", "status": "True"}]}}
+        for i in range(3)
+    ],
+}).encode()
+
+STORAGE_CLASSES = json.dumps({
+    "kind": "StorageClassList", "apiVersion": "storage.k8s.io/v1", "metadata": {"resourceVersion": "1"},
+    "items": [],
+}).encode()
+
+
+@pytest.fixture(scope="module")
+def kube_api():
+    """Fake API server listing nodes and storage classes; watches end at once with no events"""
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+        wbufsize = 1 << 16
+
+        def log_message(self, *args):
+            pass
+
+        def do_GET(self):
+            if "watch=" in self.path:
+                body = b""
+            elif self.path.startswith("/apis/storage.k8s.io/"):
+                body = STORAGE_CLASSES
+            else:
+                body = NODES
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+
+
+def run(code: str, cwd, kube_api_url: str):
+    # No in-cluster credentials or kubeconfig: imports must not need them
+    env = {k: v for k, v in os.environ.items() if k != "KUBECONFIG"}
+    env["KUBE_API_URL"] = kube_api_url
+    subprocess.run([sys.executable, "-c", code], cwd=cwd, env=env, check=True, capture_output=True)
+
+
+@pytest.mark.parametrize("service", sorted(ENTRY_POINTS))
+def bench_cold_import(benchmark, kube_api, service):
+    cwd, module = ENTRY_POINTS[service]
+    benchmark.pedantic(run, args=(f"import {module}", cwd, kube_api), rounds=5)
+
+
+def bench_cold_first_request(benchmark, kube_api):
+    benchmark.pedantic(run, args=(FIRST_REQUEST, CONTROL_PLANE_DIR, kube_api), rounds=5)
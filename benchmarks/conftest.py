@@ -0,0 +1,26 @@
+"""
+Shared setup for the pytest-benchmark suite.
+
+    pip install -r benchmarks/requirements.txt
+    pytest benchmarks                          # results saved under .benchmarks/
+    pytest-benchmark compare 0001 0002         # compare two saved runs
+
+The scaler and inference runtime are not installed packages, so their
+source directories are put on sys.path here.
+"""
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+SCALER_DIR = ROOT / "control-plane/scaler"
+RUNTIME_DIR = ROOT / "k8s/workloads/aurora/inference/runtime"
+
+for path in (SCALER_DIR, RUNTIME_DIR):
+    sys.path.insert(0, str(path))
+
+
+def record_rate(benchmark, key: str, amount: float):
+    """Store `amount` per second of the mean round in extra_info; --benchmark-disable times nothing"""
+    if benchmark.stats is None:
+        return
+    benchmark.extra_info[key] = round(amount / benchmark.stats.stats.mean)
@@ -0,0 +1,119 @@
+"""
+Per-worker memory of the inference model: pickle vs memory-mapped flat arrays.
+
+Trains a RandomForest shaped like the trainer's, stores it in both formats,
+then starts N worker processes per format. Each worker loads the model and
+holds it while the others load too, so shared pages are visible. Prints RSS
+and PSS (proportional set size, where shared pages count once per node)
+per worker, before and after the load.
+
+    python benchmarks/model_memory.py --workers 4 --samples 20000
+"""
+import os
+import sys
+import json
+import pickle
+import argparse
+import tempfile
+import multiprocessing as mp
+from pathlib import Path
+
+import numpy as np
+
+RUNTIME_DIR = Path(__file__).resolve().parents[1] / "k8s/workloads/aurora/inference/runtime"
+sys.path.insert(0, str(RUNTIME_DIR))
+
+from app.tree_arrays import FlatTreeEnsemble  # noqa: E402
+
+
+def memory_kb():
+    """(RSS, PSS) of the current process in kB"""
+    rss = pss = 0
+    with open("/proc/self/smaps_rollup") as f:
+        for line in f:
+            if line.startswith("Rss:"):
+                rss = int(line.split()[1])
+            elif line.startswith("Pss:"):
+                pss = int(line.split()[1])
+    return rss, pss
+
+
+def worker(fmt, path, probe, loaded, release, results):
+    import sklearn.ensemble  # noqa: F401  - keep import cost out of the measured delta
+
+    before = memory_kb()
+    if fmt == "pickle":
+        with open(path, "rb") as f:
+            model = pickle.load(f)
+    else:
+        model = FlatTreeEnsemble.load(path, mmap=True)
+    model.predict(probe)  # touch the model pages like real traffic would
+
+    loaded.wait()
+    after = memory_kb()
+    results.put({"format": fmt, "pid": os.getpid(), "before": before, "after": after})
+    release.wait()
+
+
+def measure(fmt, path, probe, workers):
+    ctx = mp.get_context("spawn")
+    loaded = ctx.Barrier(workers)
+    release = ctx.Event()
+    results = ctx.Queue()
+
+    procs = [ctx.Process(target=worker, args=(fmt, path, probe, loaded, release, results)) for _ in range(workers)]
+    for p in procs:
+        p.start()
+    rows = [results.get(timeout=300) for _ in procs]
+    release.set()
+    for p in procs:
+        p.join()
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--samples", type=int, default=20000)
+    parser.add_argument("--trees", type=int, default=50)
+    parser.add_argument("--json", help="Write results to this file")
+    args = parser.parse_args()
+
+    from sklearn.ensemble import RandomForestRegressor
+
+    rng = np.random.RandomState(42)
+    X = rng.rand(args.samples, 8)
+    y = rng.rand(args.samples)
+    model = RandomForestRegressor(n_estimators=args.trees, random_state=42).fit(X, y)
+
+    workdir = Path(tempfile.mkdtemp(prefix="model-memory-"))
+    pickle_path = workdir / "model.pkl"
+    with open(pickle_path, "wb") as f:
+        pickle.dump(model, f)
+    flat_path = workdir / "flat"
+    FlatTreeEnsemble.from_sklearn(model).save(flat_path)
+
+    print(f"Model: {args.trees} trees, {sum(e.tree_.node_count for e in model.estimators_)} nodes, "
+          f"pickle {pickle_path.stat().st_size / 2**20:.1f} MiB")
+
+    probe = X[:64]
+    report = {"workers": args.workers, "trees": args.trees, "samples": args.samples, "results": {}}
+    for fmt, path in (("pickle", pickle_path), ("mmap", flat_path)):
+        rows = measure(fmt, str(path), probe, args.workers)
+        rss_delta = np.mean([r["after"][0] - r["before"][0] for r in rows]) / 1024
+        pss_delta = np.mean([r["after"][1] - r["before"][1] for r in rows]) / 1024
+        pss_total = sum(r["after"][1] for r in rows) / 1024
+        report["results"][fmt] = {
+            "rss_delta_mib": round(rss_delta, 1),
+            "pss_delta_mib": round(pss_delta, 1),
+            "pss_total_mib": round(pss_total, 1),
+        }
+        print(f"{fmt:>6}: per-worker RSS +{rss_delta:7.1f} MiB, PSS +{pss_delta:7.1f} MiB, "
+              f"node total PSS {pss_total:7.1f} MiB ({args.workers} workers)")
+
+    if args.json:
+        Path(args.json).write_text(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
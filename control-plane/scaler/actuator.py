@@ -0,0 +1,207 @@
+import os
+import time
+import random
+import threading
+from typing import Callable, Dict, Optional, Tuple
+
+from kubernetes.client.rest import ApiException
+from prometheus_client import Counter, Gauge, Histogram
+
+from deployment_scaler import ReplicaCache, scale_deployment
+
+# Token bucket shared by all scale patches: sustained rate and burst size
+SCALE_RATE_PER_SECOND = float(os.getenv("SCALE_RATE_PER_SECOND", "5"))
+SCALE_BURST = int(os.getenv("SCALE_BURST", "10"))
+SCALE_MAX_RETRIES = int(os.getenv("SCALE_MAX_RETRIES", "5"))
+SCALE_RETRY_BASE_SECONDS = float(os.getenv("SCALE_RETRY_BASE_SECONDS", "0.5"))
+SCALE_RETRY_MAX_SECONDS = float(os.getenv("SCALE_RETRY_MAX_SECONDS", "30"))
+# Log and count scale decisions without patching anything
+DRY_RUN = os.getenv("DRY_RUN", "false").lower() == "true"
+
+SCALE_QUEUE_DEPTH = Gauge(
+    'nimbusops_scale_queue_depth',
+    'Deployments with a scale patch waiting to be sent'
+)
+
+SCALE_PATCH_LATENCY = Histogram(
+    'nimbusops_scale_patch_latency_seconds',
+    'Latency of scale subresource patches'
+)
+
+SCALE_PATCHES_TOTAL = Counter(
+    'nimbusops_scale_patches_total',
+    'Scale patches by outcome',
+    ['result']
+)
+
+Key = Tuple[str, str]
+
+def retryable(error: Exception) -> bool:
+    """Conflicts, throttling and server errors are worth another attempt; other API errors are not"""
+    if isinstance(error, ApiException):
+        return error.status in (409, 429) or (error.status or 0) >= 500
+    return isinstance(error, OSError)
+
+class TokenBucket:
+    def __init__(self, rate: float, burst: int):
+        self.rate = rate
+        self.burst = burst
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """Block until a token is available, then take it"""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
+
+class ScaleActuator:
+    """
+    Applies scale decisions off the control loop.
+
+    Only the latest desired count per deployment is kept: a decision that
+    arrives while an older one is queued or backing off replaces it. One
+    worker sends patches through a shared token bucket and retries
+    409/429/5xx with jittered exponential backoff (honouring Retry-After).
+    A patch is skipped when the watch cache shows the deployment already
+    at the desired count.
+    """
+
+    def __init__(
+        self,
+        patch: Callable[[str, str, int], None] = scale_deployment,
+        replica_cache: Optional[ReplicaCache] = None,
+        dry_run: bool = DRY_RUN,
+        rate: float = SCALE_RATE_PER_SECOND,
+        burst: int = SCALE_BURST,
+        max_retries: int = SCALE_MAX_RETRIES,
+    ):
+        self.patch = patch
+        self.replica_cache = replica_cache
+        self.dry_run = dry_run
+        self.max_retries = max_retries
+        self.bucket = TokenBucket(rate, burst)
+
+        # Insertion-ordered: the oldest pending deployment is patched first
+        self._pending: Dict[Key, int] = {}
+        self._attempts: Dict[Key, int] = {}
+        self._not_before: Dict[Key, float] = {}
+        self._cond = threading.Condition()
+        self._running = True
+        self._worker = threading.Thread(target=self._run, daemon=True, name="scale-actuator")
+        self._worker.start()
+
+    def submit(self, namespace: str, name: str, replicas: int):
+        key = (namespace, name)
+        with self._cond:
+            if key in self._pending:
+                SCALE_PATCHES_TOTAL.labels(result="coalesced").inc()
+                if self._pending[key] != replicas:
+                    # A new target gets a fresh retry budget; a running backoff still holds
+                    self._attempts.pop(key, None)
+            self._pending[key] = replicas
+            SCALE_QUEUE_DEPTH.set(len(self._pending))
+            self._cond.notify()
+
+    def pending(self) -> Dict[Key, int]:
+        with self._cond:
+            return dict(self._pending)
+
+    def stop(self, timeout: float = 5.0):
+        with self._cond:
+            self._running = False
+            self._cond.notify()
+        self._worker.join(timeout)
+
+    # ---------------- Worker ----------------
+    def _next(self) -> Optional[Tuple[Key, int]]:
+        with self._cond:
+            while self._running:
+                now = time.monotonic()
+                for key, replicas in self._pending.items():
+                    if self._not_before.get(key, 0.0) <= now:
+                        del self._pending[key]
+                        SCALE_QUEUE_DEPTH.set(len(self._pending))
+                        return key, replicas
+                backoffs = [self._not_before[key] - now for key in self._pending if key in self._not_before]
+                self._cond.wait(min(backoffs) if backoffs else None)
+            return None
+
+    def _run(self):
+        while True:
+            item = self._next()
+            if item is None:
+                return
+            key, replicas = item
+            try:
+                self._apply(key, replicas)
+            except Exception as e:
+                print(f"[NimbusOps] Scale of {key[0]}/{key[1]} to {replicas} crashed: {e}")
+
+    def _apply(self, key: Key, replicas: int):
+        namespace, name = key
+        if self.replica_cache is not None:
+            status = self.replica_cache.get(namespace, name)
+            if status is not None and status.replicas == replicas:
+                SCALE_PATCHES_TOTAL.labels(result="unchanged").inc()
+                self._done(key, replicas)
+                return
+
+        if self.dry_run:
+            print(f"[NimbusOps] DRY_RUN: would scale {namespace}/{name} to {replicas}")
+            SCALE_PATCHES_TOTAL.labels(result="dry_run").inc()
+            self._done(key, replicas)
+            return
+
+        self.bucket.acquire()
+        try:
+            with SCALE_PATCH_LATENCY.time():
+                self.patch(namespace, name, replicas)
+        except Exception as e:
+            self._failed(key, replicas, e)
+            return
+
+        SCALE_PATCHES_TOTAL.labels(result="applied").inc()
+        print(f"[NimbusOps] Scaled {namespace}/{name} to {replicas}")
+        self._done(key, replicas)
+
+    def _done(self, key: Key, replicas: int):
+        with self._cond:
+            # Keep the state of a newer decision that arrived while this one was in flight
+            if key not in self._pending:
+                self._attempts.pop(key, None)
+                self._not_before.pop(key, None)
+
+    def _failed(self, key: Key, replicas: int, error: Exception):
+        namespace, name = key
+        with self._cond:
+            attempt = self._attempts.get(key, 0) + 1
+            if not retryable(error) or attempt > self.max_retries:
+                SCALE_PATCHES_TOTAL.labels(result="failed").inc()
+                print(f"[NimbusOps] Scale of {namespace}/{name} to {replicas} failed after {attempt} attempt(s): {error}")
+                if key not in self._pending:
+                    self._attempts.pop(key, None)
+                    self._not_before.pop(key, None)
+                return
+
+            SCALE_PATCHES_TOTAL.labels(result="retried").inc()
+            delay = random.uniform(0, min(SCALE_RETRY_MAX_SECONDS, SCALE_RETRY_BASE_SECONDS * 2 ** attempt))
+            retry_after = getattr(error, "headers", None) and error.headers.get("Retry-After")
+            if retry_after and retry_after.isdigit():
+                delay = max(delay, float(retry_after))
+            print(f"[NimbusOps] Scale of {namespace}/{name} to {replicas} failed ({error.__class__.__name__}), retry {attempt} in {delay:.1f}s")
+
+            # A newer decision queued meanwhile wins; otherwise requeue this one
+            self._pending.setdefault(key, replicas)
+            self._attempts[key] = attempt
+            self._not_before[key] = time.monotonic() + delay
+            SCALE_QUEUE_DEPTH.set(len(self._pending))
+            self._cond.notify()
@@ -1,9 +1,259 @@
+import os
+import math
 import time
-from typing import Dict, Any
+from collections import deque
+from typing import Callable, Dict, Any, Optional, Tuple
 import json
 
+import numpy as np
+
+from history import RingHistory
+
+# Samples considered by the trend predictor
+TREND_WINDOW_SECONDS = 300
+# Forecaster used by the default policy
+FORECASTER = os.getenv("FORECASTER", "trend")
+# "step" moves one replica per decision; "proportional" computes the target directly;
+# "multi_signal" takes the largest replica count needed by CPU, memory, request rate and latency
+SCALING_MODE = os.getenv("SCALING_MODE", "step")
+# Step mode: minimum time between two scale events of one deployment, however short the loop interval;
+# defaults to the base loop interval, so ticks at that interval are never held
+STEP_COOLDOWN_SECONDS = float(os.getenv("STEP_COOLDOWN_SECONDS", os.getenv("LOOP_INTERVAL_SECONDS", "60")))
+# Fraction of the cooldown forgiven for loop jitter (a 60 s tick may land a little early)
+STEP_COOLDOWN_SLACK = 0.1
+# p95 latency objective for multi_signal mode; an MLDeployment's slo.latencyP95Ms overrides it
+LATENCY_SLO_SECONDS = float(os.getenv("LATENCY_SLO_SECONDS", "0.3"))
+# Requests per second one replica serves within the SLO; 0 leaves request rate out
+TARGET_RPS_PER_REPLICA = float(os.getenv("TARGET_RPS_PER_REPLICA", "0"))
+# Predicted CPU this close to a scaling boundary, or this far from current CPU, shortens the loop interval
+ATTENTION_MARGIN = float(os.getenv("ATTENTION_MARGIN", "0.05"))
+ATTENTION_CHANGE = float(os.getenv("ATTENTION_CHANGE", "0.1"))
+# Forecast errors kept for the rolling MAE
+MAE_WINDOW = int(os.getenv("FORECAST_MAE_WINDOW", "1440"))
+
+# ---------------- Forecasters ----------------
+class Forecaster:
+    """
+    Incremental forecaster of one series. `update` is O(1) per sample.
+    Every forecast is kept until its horizon passes, then scored against
+    the observed value, so each model has a rolling MAE to compare.
+    Windowed forecasters read their samples from the engine's RingHistory,
+    which already holds every sample before it is observed.
+    """
+
+    name = "base"
+
+    def __init__(self, history: Optional[RingHistory] = None):
+        self.history = history
+        self._pending = deque()  # (due timestamp, predicted value)
+        self._errors = deque(maxlen=MAE_WINDOW)
+        self._error_sum = 0.0
+
+    def update(self, timestamp: float, value: float):
+        raise NotImplementedError
+
+    def forecast(self, horizon_seconds: float) -> Optional[float]:
+        """Predicted value `horizon_seconds` after the last update, or None until warmed up"""
+        raise NotImplementedError
+
+    def observe(self, timestamp: float, value: float, horizon_seconds: float):
+        """Score forecasts that came due, learn from the sample and forecast the horizon"""
+        while self._pending and self._pending[0][0] <= timestamp:
+            _, predicted = self._pending.popleft()
+            if len(self._errors) == self._errors.maxlen:
+                self._error_sum -= self._errors[0]
+            error = abs(value - predicted)
+            self._errors.append(error)
+            self._error_sum += error
+
+        self.update(timestamp, value)
+        predicted = self.forecast(horizon_seconds)
+        if predicted is not None:
+            self._pending.append((timestamp + horizon_seconds, float(predicted)))
+
+    @property
+    def mae(self) -> Optional[float]:
+        return self._error_sum / len(self._errors) if self._errors else None
+
+class TrendForecaster(Forecaster):
+    """
+    Original heuristic: last value plus the trend over the last 5 minutes
+    of history. The trend is per sample spacing, so it stays time-consistent
+    when the loop interval adapts. Decisions keep the original 6-minute
+    projection ("6 intervals ahead" at 60 s ticks); forecasts scored for
+    the MAE project to the requested horizon like every other model.
+    """
+
+    name = "trend"
+
+    def __init__(self, history: RingHistory, window_seconds: float = TREND_WINDOW_SECONDS,
+                 decision_horizon_seconds: float = 360):
+        super().__init__(history)
+        self.window_seconds = window_seconds
+        self.decision_horizon_seconds = decision_horizon_seconds
+        self._last_ts: Optional[float] = None
+
+    def update(self, timestamp: float, value: float):
+        self._last_ts = timestamp
+
+    def forecast(self, horizon_seconds: float) -> Optional[float]:
+        if self._last_ts is None:
+            return None
+        recent = self.history.window(self.window_seconds, now=self._last_ts)
+        if not len(recent):
+            return None
+        last = float(recent["cpu"][-1])
+        if len(recent) < 3:
+            return last
+        first_ts, first = float(recent["timestamp"][0]), float(recent["cpu"][0])
+        spacing = (float(recent["timestamp"][-1]) - first_ts) / (len(recent) - 1)
+        if spacing <= 0:
+            return last
+        trend = (last - first) / (len(recent) * spacing)  # per second
+        return last + trend * horizon_seconds
+
+class EWMAForecaster(Forecaster):
+    """Exponentially weighted moving average; decay follows wall-clock time, forecast is flat"""
+
+    name = "ewma"
+
+    def __init__(self, history: Optional[RingHistory] = None, halflife_seconds: float = 600):
+        super().__init__(history)
+        self.halflife_seconds = halflife_seconds
+        self.level: Optional[float] = None
+        self._last_ts: Optional[float] = None
+
+    def update(self, timestamp: float, value: float):
+        if self.level is None:
+            self.level = value
+        else:
+            alpha = 1.0 - 0.5 ** (max(timestamp - self._last_ts, 0.0) / self.halflife_seconds)
+            self.level += alpha * (value - self.level)
+        self._last_ts = timestamp
+
+    def forecast(self, horizon_seconds: float) -> Optional[float]:
+        return self.level
+
+class LinearRegressionForecaster(Forecaster):
+    """
+    Least-squares line over a sliding time window of history, kept as
+    running sums: each update adds the new sample and subtracts the ones
+    that left the window.
+    """
+
+    name = "linear"
+
+    def __init__(self, history: RingHistory, window_seconds: float = 1800):
+        super().__init__(history)
+        self.window_seconds = window_seconds
+        self._cutoff: Optional[float] = None  # samples at or before this have been subtracted
+        self._last_ts: Optional[float] = None
+        # Oldest sample in the window: t stays within [0, window] for numerically stable sums
+        self._origin: Optional[float] = None
+        self._sums = np.zeros(5)  # n, Σt, Σv, Σt², Σtv
+
+    def _add(self, timestamps: np.ndarray, values: np.ndarray, sign: float):
+        t = timestamps - self._origin
+        self._sums += sign * np.array([len(t), t.sum(), values.sum(), (t * t).sum(), (t * values).sum()])
+
+    def _recenter(self, origin: float):
+        """Shift the sums to t measured from `origin`: Σ(t-d) = Σt - nd, Σ(t-d)² = Σt² - 2dΣt + nd²"""
+        d = origin - self._origin
+        if d:
+            n, st, sv, stt, stv = self._sums
+            self._sums = np.array([n, st - n * d, sv, stt - 2 * d * st + n * d * d, stv - d * sv])
+            self._origin = origin
+
+    def update(self, timestamp: float, value: float):
+        if self._origin is None:
+            self._origin = timestamp
+            self._cutoff = timestamp - self.window_seconds
+        # The value as the ring stores it (float32), so it cancels when it leaves the window
+        self._add(np.array([timestamp]), np.array([value], dtype=np.float32).astype(np.float64), 1.0)
+        self._last_ts = timestamp
+
+        cutoff = timestamp - self.window_seconds
+        if cutoff > self._cutoff:
+            left = self.history.window(cutoff - self._cutoff, now=cutoff)
+            if len(left):
+                self._add(left["timestamp"], left["cpu"].astype(np.float64), -1.0)
+            self._cutoff = cutoff
+        remaining = self.history.window(self.window_seconds, now=timestamp)
+        if len(remaining):
+            self._recenter(float(remaining["timestamp"][0]))
+
+    def forecast(self, horizon_seconds: float) -> Optional[float]:
+        n, st, sv, stt, stv = self._sums
+        if n < 0.5:
+            return None
+        t = self._last_ts - self._origin + horizon_seconds
+        denominator = n * stt - st * st
+        if n < 2.5 or denominator <= 1e-9:
+            return sv / n
+        slope = (n * stv - st * sv) / denominator
+        intercept = (sv - slope * st) / n
+        return intercept + slope * t
+
+class HoltWintersForecaster(Forecaster):
+    """
+    Additive Holt-Winters with a daily and a weekly seasonal component.
+    Seasonal profiles are NumPy arrays indexed by time-of-day / time-of-week
+    slot, so each update touches one slot of each.
+    """
+
+    name = "holt_winters"
+
+    DAY = 24 * 3600
+    WEEK = 7 * DAY
+
+    def __init__(self, history: Optional[RingHistory] = None, step_seconds: float = 60, alpha: float = 0.2,
+                 beta: float = 0.01, gamma_daily: float = 0.3, gamma_weekly: float = 0.3):
+        super().__init__(history)
+        self.step_seconds = step_seconds
+        self.alpha, self.beta = alpha, beta
+        self.gamma_daily, self.gamma_weekly = gamma_daily, gamma_weekly
+        self.daily = np.zeros(int(self.DAY // step_seconds))
+        self.weekly = np.zeros(int(self.WEEK // step_seconds))
+        self.level: Optional[float] = None
+        self.trend = 0.0  # per second
+        self._last_ts: Optional[float] = None
+
+    def _slots(self, timestamp: float):
+        step = int(timestamp // self.step_seconds)
+        return step % len(self.daily), step % len(self.weekly)
+
+    def update(self, timestamp: float, value: float):
+        d, w = self._slots(timestamp)
+        s_daily, s_weekly = self.daily[d], self.weekly[w]
+
+        if self.level is None:
+            self.level = value
+        else:
+            dt = max(timestamp - self._last_ts, 1e-9)
+            previous = self.level
+            self.level = self.alpha * (value - s_daily - s_weekly) + (1 - self.alpha) * (previous + self.trend * dt)
+            self.trend = self.beta * (self.level - previous) / dt + (1 - self.beta) * self.trend
+
+        self.daily[d] = self.gamma_daily * (value - self.level - s_weekly) + (1 - self.gamma_daily) * s_daily
+        self.weekly[w] = self.gamma_weekly * (value - self.level - self.daily[d]) + (1 - self.gamma_weekly) * s_weekly
+        self._last_ts = timestamp
+
+    def forecast(self, horizon_seconds: float) -> Optional[float]:
+        if self.level is None:
+            return None
+        d, w = self._slots(self._last_ts + horizon_seconds)
+        return self.level + self.trend * horizon_seconds + self.daily[d] + self.weekly[w]
+
+FORECASTERS = {
+    cls.name: cls
+    for cls in (TrendForecaster, EWMAForecaster, LinearRegressionForecaster, HoltWintersForecaster)
+}
+
 class CostAwareDecisionEngine:
-    def __init__(self):
+    def __init__(self, clock: Callable[[], float] = time.time):
+        # Wall-clock source; the simulator injects a replayed clock
+        self.clock = clock
+
         # Policy configuration
         self.policies = {
             "default": {
@@ -15,7 +265,23 @@ class CostAwareDecisionEngine:
                 "cost_weight": 0.4,  # How much cost influences decision (0-1)
                 "performance_weight": 0.6,
                 "min_savings_percent": 15,  # Minimum % savings to trigger scale-down
-                "prediction_window_minutes": 30
+                "prediction_window_minutes": 30,  # Forecast horizon
+                "forecaster": FORECASTER,  # One of FORECASTERS
+                "scaling_mode": SCALING_MODE,
+                # Step mode: moves no faster than the base loop interval when the loop speeds up
+                "step_cooldown_seconds": STEP_COOLDOWN_SECONDS,
+                # Proportional mode: ceil(current * predicted / target_cpu), HPA-style
+                "tolerance": 0.1,  # Ignore utilization within ±10% of target_cpu
+                "max_scale_up_step": 4,  # Replicas added per decision at most
+                "max_scale_down_step": 1,  # Replicas removed per decision at most
+                "scale_up_stabilization_seconds": 0,
+                "scale_down_stabilization_seconds": 300,
+                # Multi-signal mode: every signal sizes the deployment, the largest wins
+                "target_memory": 0.75,  # Fraction of the memory limit
+                "target_rps_per_replica": TARGET_RPS_PER_REPLICA,
+                "latency_slo_seconds": LATENCY_SLO_SECONDS,
+                # Headroom factor 1 + weight_headroom * (performance_weight - cost_weight)
+                "weight_headroom": 0.25
             }
         }
         
@@ -33,30 +299,148 @@ class CostAwareDecisionEngine:
             }
         }
         
-        # Historical data for prediction (in-memory cache)
-        self.history = {
-            "cpu": [],
-            "timestamps": [],
-            "replicas": []
-        }
-        
-    def predict_future_load(self, current_cpu: float, history_length: int = 10) -> float:
-        """Simple linear prediction based on recent trend"""
-        if len(self.history["cpu"]) < 3:
-            return current_cpu
-            
-        # Simple moving average with trend
-        recent = self.history["cpu"][-min(5, len(self.history["cpu"])):]
-        avg = sum(recent) / len(recent)
+        # Recent proportional-mode recommendations (timestamp, replicas) for stabilization
+        self.recommendations = deque()
+        # When step mode last changed the replica count, for its cooldown
+        self.last_step_scale: Optional[float] = None
+
+        # Historical data for prediction (fixed-size ring buffer)
+        self.history = RingHistory()
+
+        # Every forecaster learns from every sample so their errors can be compared live;
+        # the policy's "forecaster" drives decisions
+        self.forecasters = {name: cls(self.history) for name, cls in FORECASTERS.items()}
+
+    def horizon_seconds(self, policy_name: str = "default") -> float:
+        return self.policies[policy_name]["prediction_window_minutes"] * 60
+
+    def observe(self, timestamp: float, cpu: float, policy_name: str = "default"):
+        horizon = self.horizon_seconds(policy_name)
+        for forecaster in self.forecasters.values():
+            forecaster.observe(timestamp, cpu, horizon)
+
+    def warm_start(self, policy_name: str = "default"):
+        """Replay stored history into fresh forecasters, e.g. after restoring a snapshot"""
+        self.forecasters = {name: cls(self.history) for name, cls in FORECASTERS.items()}
+        samples = self.history.last(len(self.history))
+        for timestamp, cpu in zip(samples["timestamp"].tolist(), samples["cpu"].tolist()):
+            self.observe(timestamp, cpu, policy_name)
+
+    def forecast_errors(self) -> Dict[str, Optional[float]]:
+        """Rolling MAE of each forecaster at the policy horizon (None until a forecast comes due)"""
+        return {name: forecaster.mae for name, forecaster in self.forecasters.items()}
         
-        # Detect trend
-        if len(recent) >= 3:
-            trend = (recent[-1] - recent[0]) / len(recent)
-            predicted = current_cpu + (trend * 6)  # Project 6 intervals ahead
-        else:
-            predicted = avg
+    def forecast_load(self, current_cpu: float, policy_name: str = "default") -> float:
+        """Unbounded CPU forecast at the policy horizon with the policy's forecaster"""
+        policy = self.policies[policy_name]
+        forecaster = self.forecasters.get(policy["forecaster"], self.forecasters["trend"])
+        horizon = getattr(forecaster, "decision_horizon_seconds", None) or self.horizon_seconds(policy_name)
+        predicted = forecaster.forecast(horizon)
+        return current_cpu if predicted is None else float(predicted)
+
+    def predict_future_load(self, current_cpu: float, policy_name: str = "default") -> float:
+        """Forecast CPU at the policy horizon with the policy's forecaster"""
+        predicted = self.forecast_load(current_cpu, policy_name)
             
         return max(0.1, min(0.95, predicted))  # Bound prediction
+
+    def proportional_target(self, current: int, predicted_cpu: float, now: float,
+                            policy_name: str = "default") -> Tuple[int, str]:
+        """
+        Replicas needed to bring predicted utilization to target_cpu,
+        stabilized like the HPA: scale-down follows the highest
+        recommendation in its window, scale-up the lowest. Step limits are
+        applied later, after the cost check has judged the full move.
+        """
+        policy = self.policies[policy_name]
+        recommended = self._ratio_replicas(current, predicted_cpu / policy["target_cpu"], policy)
+        recommended = max(policy["min_replicas"], min(policy["max_replicas"], recommended))
+        target = self.stabilize(current, recommended, now, policy_name)
+
+        reason = (
+            f"Predicted CPU ({predicted_cpu:.2f}) vs target ({policy['target_cpu']}): "
+            f"{recommended} replicas recommended, {target} after stabilization"
+        )
+        return target, reason
+
+    @staticmethod
+    def _ratio_replicas(current: int, ratio: float, policy: Dict[str, Any]) -> int:
+        """Replicas that bring a utilization ratio (observed / target) back to 1, within tolerance"""
+        if abs(ratio - 1) <= policy["tolerance"]:
+            return current
+        return math.ceil(current * ratio)
+
+    def stabilize(self, current: int, recommended: int, now: float, policy_name: str = "default") -> int:
+        """Hold scale-down at the highest and scale-up at the lowest recommendation of their windows"""
+        policy = self.policies[policy_name]
+        self.recommendations.append((now, recommended))
+        longest = max(policy["scale_up_stabilization_seconds"], policy["scale_down_stabilization_seconds"])
+        while self.recommendations[0][0] < now - longest:
+            self.recommendations.popleft()
+
+        def window(seconds):
+            return [r for t, r in self.recommendations if t >= now - seconds]
+
+        target = recommended
+        if recommended < current:
+            target = min(current, max(window(policy["scale_down_stabilization_seconds"])))
+        elif recommended > current:
+            target = max(current, min(window(policy["scale_up_stabilization_seconds"])))
+        return target
+
+    def signal_replicas(self, current: int, predicted_cpu: float, metrics: Dict[str, Any],
+                        policy_name: str = "default") -> Dict[str, int]:
+        """
+        Replicas each capacity signal needs on its own, with the weight
+        headroom applied to every utilization ratio. Signals without data
+        (missing or zero) are left out. Latency only pushes upwards: a p95
+        under the SLO says nothing about how many replicas could go, so it
+        only holds the current count once it is within tolerance of the SLO.
+        """
+        policy = self.policies[policy_name]
+        headroom = self.headroom(policy_name)
+        needed = {"cpu": self._ratio_replicas(current, headroom * predicted_cpu / policy["target_cpu"], policy)}
+
+        memory = metrics.get("memory_usage") or 0.0  # percent of the memory limit
+        if memory > 0:
+            needed["memory"] = self._ratio_replicas(current, headroom * memory / 100 / policy["target_memory"], policy)
+
+        request_rate = metrics.get("request_rate") or 0.0
+        # Without Istio metrics the fallback query reports network KB/s, which says nothing about requests
+        if metrics.get("request_rate_unit", "req/s") != "req/s":
+            request_rate = 0.0
+        if policy["target_rps_per_replica"] > 0 and request_rate > 0:
+            needed["request_rate"] = math.ceil(headroom * request_rate / policy["target_rps_per_replica"])
+
+        latency = metrics.get("latency_p95") or 0.0
+        if policy["latency_slo_seconds"] > 0 and latency > 0:
+            ratio = headroom * latency / policy["latency_slo_seconds"]
+            if ratio >= 1 - policy["tolerance"]:
+                needed["latency"] = self._ratio_replicas(current, ratio, policy)
+
+        return needed
+
+    def headroom(self, policy_name: str = "default") -> float:
+        """performance_weight above cost_weight sizes for more than the targets, the reverse for less"""
+        policy = self.policies[policy_name]
+        return 1 + policy["weight_headroom"] * (policy["performance_weight"] - policy["cost_weight"])
+
+    def multi_signal_target(self, current: int, predicted_cpu: float, metrics: Dict[str, Any], now: float,
+                            policy_name: str = "default") -> Tuple[int, str, str, Dict[str, int]]:
+        """Largest per-signal replica count, stabilized like proportional mode"""
+        policy = self.policies[policy_name]
+        needed = self.signal_replicas(current, predicted_cpu, metrics, policy_name)
+        driver = max(needed, key=needed.get)
+
+        recommended = max(policy["min_replicas"], min(policy["max_replicas"], needed[driver]))
+        target = self.stabilize(current, recommended, now, policy_name)
+
+        signals = ", ".join(f"{name}={count}" for name, count in needed.items())
+        reason = (
+            f"{driver} needs the most replicas ({signals}, {self.headroom(policy_name):.2f}x headroom); "
+            f"{target} after stabilization"
+        )
+        return target, reason, driver, needed
     
     def calculate_cost_impact(self, current_replicas: int, proposed_replicas: int) -> Dict[str, float]:
         """Calculate cost difference between current and proposed state"""
@@ -86,7 +470,7 @@ class CostAwareDecisionEngine:
         # Ensure we don't scale down too aggressively during predicted peak
         if proposed < current:
             # Check if we're approaching predicted peak time
-            current_hour = time.localtime().tm_hour
+            current_hour = time.localtime(self.clock()).tm_hour
             if 9 <= current_hour <= 17:  # Business hours
                 # Be conservative about scaling down during work hours
                 if (current - proposed) > 1:
@@ -94,6 +478,19 @@ class CostAwareDecisionEngine:
                     
         return True
     
+    def needs_attention(self, decision: Dict[str, Any], current: int, policy_name: str = "default") -> bool:
+        """Whether load is near a scaling boundary or moving fast, so the next decision should come sooner"""
+        policy = self.policies[policy_name]
+        predicted, cpu = decision["predicted_load"], decision["current_cpu"]
+        if decision["replicas"] != current or abs(predicted - cpu) >= ATTENTION_CHANGE:
+            return True
+
+        if policy["scaling_mode"] in ("proportional", "multi_signal"):
+            boundaries = (policy["target_cpu"] * (1 - policy["tolerance"]), policy["target_cpu"] * (1 + policy["tolerance"]))
+        else:
+            boundaries = (policy["scale_down_threshold"], policy["scale_up_threshold"])
+        return min(abs(predicted - b) for b in boundaries) <= ATTENTION_MARGIN
+
     def decide_replicas(self, current: int, cpu: float, 
                        additional_metrics: Dict[str, Any] = None) -> Dict[str, Any]:
         """
@@ -108,23 +505,26 @@ class CostAwareDecisionEngine:
         }
         """
         # Update history
-        self.history["cpu"].append(cpu)
-        self.history["timestamps"].append(time.time())
-        self.history["replicas"].append(current)
-        
-        # Keep history manageable
-        if len(self.history["cpu"]) > 100:
-            self.history["cpu"] = self.history["cpu"][-50:]
-            self.history["timestamps"] = self.history["timestamps"][-50:]
-            self.history["replicas"] = self.history["replicas"][-50:]
+        additional_metrics = additional_metrics or {}
+        now = self.clock()
+        self.history.append(now, cpu, current, additional_metrics.get("request_rate", 0.0))
+        self.observe(now, cpu)
         
         policy = self.policies["default"]
         predicted_cpu = self.predict_future_load(cpu)
         
         # Base decision on predicted load
         base_decision = current
+        driver, needed = "cpu", None
         
-        if predicted_cpu > policy["scale_up_threshold"]:
+        if policy["scaling_mode"] == "multi_signal":
+            predicted_cpu = max(0.0, self.forecast_load(cpu))
+            base_decision, reason, driver, needed = self.multi_signal_target(current, predicted_cpu, additional_metrics, now)
+        elif policy["scaling_mode"] == "proportional":
+            # The 0.1-0.95 bound would cap how far one decision can move
+            predicted_cpu = max(0.0, self.forecast_load(cpu))
+            base_decision, reason = self.proportional_target(current, predicted_cpu, now)
+        elif predicted_cpu > policy["scale_up_threshold"]:
             base_decision = min(current + 1, policy["max_replicas"])
             reason = f"Predicted CPU ({predicted_cpu:.2f}) > threshold ({policy['scale_up_threshold']})"
         elif predicted_cpu < policy["scale_down_threshold"]:
@@ -136,6 +536,7 @@ class CostAwareDecisionEngine:
         
         # Apply cost optimization
         cost_impact = self.calculate_cost_impact(current, base_decision)
+        proposed = base_decision
         
         # If scaling down, check if it meets minimum savings policy
         if base_decision < current:
@@ -144,10 +545,30 @@ class CostAwareDecisionEngine:
                 base_decision = current
                 reason = f"Scale-down blocked: Savings ({cost_impact['percent_savings']}%) < minimum ({policy['min_savings_percent']}%)"
         
+        # Pace multi-replica moves; single steps are always within the limits
+        stepped = max(current - policy["max_scale_down_step"], min(current + policy["max_scale_up_step"], base_decision))
+        if stepped != base_decision:
+            reason += f"; limited to {stepped} this step"
+            base_decision = stepped
+        
         # Final policy check
         if not self.check_policy_constraints(current, base_decision):
             base_decision = current
             reason = "Blocked by policy constraints"
+
+        # The adaptive loop can tick every few seconds; step mode has no stabilization window of its own
+        stepping = policy["scaling_mode"] not in ("proportional", "multi_signal")
+        if stepping and base_decision != current:
+            cooldown = policy["step_cooldown_seconds"]
+            if self.last_step_scale is not None and now - self.last_step_scale < cooldown * (1 - STEP_COOLDOWN_SLACK):
+                reason += f"; held, last step {now - self.last_step_scale:.0f}s ago (cooldown {cooldown:.0f}s)"
+                base_decision = current
+            else:
+                self.last_step_scale = now
+
+        # Report the cost of what is actually applied, not of the unclamped proposal the savings gate saw
+        if base_decision != proposed:
+            cost_impact = self.calculate_cost_impact(current, base_decision)
         
         return {
             "replicas": base_decision,
@@ -155,8 +576,11 @@ class CostAwareDecisionEngine:
             "cost_impact": cost_impact,
             "predicted_load": predicted_cpu,
             "policy_used": "default",
+            "scaling_mode": policy["scaling_mode"],
+            "driving_signal": driver,
+            "signal_replicas": needed,
             "current_cpu": cpu,
-            "timestamp": time.time()
+            "timestamp": now
         }
 
 # Singleton instance
@@ -1,7 +1,196 @@
-from kubernetes import client, config
+import os
+import time
+import threading
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Dict, Iterable, Optional, Tuple
 
-config.load_incluster_config()
-apps = client.AppsV1Api()
+from kubernetes import client, config, watch
+from kubernetes.client.rest import ApiException
+from prometheus_client import Counter
+
+# API server to talk to instead of the in-cluster/kubeconfig one, e.g. a local fake
+KUBE_API_URL = os.getenv("KUBE_API_URL", "")
+
+# Server-side timeout of one watch request; the watch resumes from the last resourceVersion
+WATCH_TIMEOUT_SECONDS = int(os.getenv("WATCH_TIMEOUT_SECONDS", "300"))
+WATCH_RETRY_MAX_SECONDS = float(os.getenv("WATCH_RETRY_MAX_SECONDS", "30"))
+# How long startup waits for the initial list before reads fall back to the API
+WATCH_SYNC_TIMEOUT_SECONDS = float(os.getenv("WATCH_SYNC_TIMEOUT_SECONDS", "10"))
+
+WATCH_RESTARTS = Counter(
+    'nimbusops_deployment_watch_restarts_total',
+    'Deployment watch restarts',
+    ['namespace', 'reason']
+)
+
+Key = Tuple[str, str]
+
+_client_lock = threading.Lock()
+_api_client: Optional[client.ApiClient] = None
+
+def api_client() -> client.ApiClient:
+    """
+    The scaler's one ApiClient, configured on first use rather than at
+    import, so simulation and benchmarks import this module outside a
+    cluster. The watch, reads and scale patches share its connection pool.
+    """
+    global _api_client
+    if _api_client is None:
+        with _client_lock:
+            if _api_client is None:
+                if KUBE_API_URL:
+                    configuration = client.Configuration()
+                    configuration.host = KUBE_API_URL
+                else:
+                    try:
+                        config.load_incluster_config()
+                    except config.ConfigException:
+                        config.load_kube_config()
+                    configuration = client.Configuration.get_default_copy()
+                _api_client = client.ApiClient(configuration)
+    return _api_client
+
+def use_api_client(api: client.ApiClient):
+    """Swap in another ApiClient (e.g. one pointed at a fake API server)"""
+    global _api_client
+    with _client_lock:
+        _api_client = api
+    apps.cache_clear()
+    custom.cache_clear()
+
+@lru_cache(maxsize=None)
+def apps() -> client.AppsV1Api:
+    return client.AppsV1Api(api_client())
+
+@lru_cache(maxsize=None)
+def custom() -> client.CustomObjectsApi:
+    return client.CustomObjectsApi(api_client())
+
+@dataclass(frozen=True)
+class ReplicaStatus:
+    replicas: int  # spec.replicas
+    ready_replicas: int  # status.readyReplicas
+    resource_version: str
+
+class ReplicaCache:
+    """
+    Informer-style cache of Deployment replica counts, one list+watch per
+    namespace. Reads are dict lookups; the API server pushes changes made
+    by anyone (kubectl scale, rollouts, other controllers). Each watch
+    resumes from the last resourceVersion it saw (bookmarks included) and
+    only re-lists when the server answers 410 Gone.
+    """
+
+    def __init__(self, namespaces: Iterable[str]):
+        self.namespaces = sorted(set(namespaces))
+        # One dict per namespace, written only by that namespace's watch thread, so a relist
+        # in one namespace can never drop events another namespace's watch is applying
+        self._items: Dict[str, Dict[str, ReplicaStatus]] = {namespace: {} for namespace in self.namespaces}
+        self._synced = {namespace: threading.Event() for namespace in self.namespaces}
+        self._stop = threading.Event()
+        self._watches: Dict[str, watch.Watch] = {}
+
+    def start(self):
+        for namespace in self.namespaces:
+            threading.Thread(
+                target=self._run, args=(namespace,), daemon=True, name=f"watch-deployments-{namespace}"
+            ).start()
+        return self
+
+    def wait_synced(self, timeout: float = WATCH_SYNC_TIMEOUT_SECONDS) -> bool:
+        deadline = time.monotonic() + timeout
+        return all(event.wait(max(0.0, deadline - time.monotonic())) for event in self._synced.values())
+
+    def get(self, namespace: str, name: str) -> Optional[ReplicaStatus]:
+        """Cached status; None if the namespace has not synced yet or the deployment does not exist"""
+        synced = self._synced.get(namespace)
+        if synced is None or not synced.is_set():
+            return None
+        return self._items[namespace].get(name)
+
+    def watches(self, namespace: str) -> bool:
+        return namespace in self._synced
+
+    def stop(self):
+        self._stop.set()
+        for w in list(self._watches.values()):
+            w.stop()
+
+    # ---------------- List + watch ----------------
+    @staticmethod
+    def _status(deployment) -> ReplicaStatus:
+        return ReplicaStatus(
+            replicas=deployment.spec.replicas or 0,
+            ready_replicas=(deployment.status.ready_replicas or 0) if deployment.status else 0,
+            resource_version=deployment.metadata.resource_version,
+        )
+
+    def _list(self, namespace: str) -> str:
+        listing = apps().list_namespaced_deployment(namespace)
+        # Swap in the new snapshot in one step so readers never see a half-built namespace
+        self._items[namespace] = {d.metadata.name: self._status(d) for d in listing.items}
+        self._synced[namespace].set()
+        return listing.metadata.resource_version
+
+    def _run(self, namespace: str):
+        resource_version = None
+        delay = 1.0
+        while not self._stop.is_set():
+            try:
+                if resource_version is None:
+                    resource_version = self._list(namespace)
+                resource_version = self._watch(namespace, resource_version)
+                delay = 1.0
+            except ApiException as e:
+                if e.status == 410:
+                    # Our resourceVersion was compacted away; start over from a fresh list
+                    WATCH_RESTARTS.labels(namespace=namespace, reason="expired").inc()
+                    resource_version = None
+                    continue
+                WATCH_RESTARTS.labels(namespace=namespace, reason="error").inc()
+                print(f"[NimbusOps] Deployment watch in {namespace} failed ({e.status}), retrying in {delay:.0f}s")
+                self._stop.wait(delay)
+                delay = min(delay * 2, WATCH_RETRY_MAX_SECONDS)
+            except Exception as e:
+                WATCH_RESTARTS.labels(namespace=namespace, reason="error").inc()
+                print(f"[NimbusOps] Deployment watch in {namespace} failed: {e}, retrying in {delay:.0f}s")
+                self._stop.wait(delay)
+                delay = min(delay * 2, WATCH_RETRY_MAX_SECONDS)
+
+    def _watch(self, namespace: str, resource_version: str) -> str:
+        """Apply events until the server closes the watch; returns the resourceVersion to resume from"""
+        w = watch.Watch()
+        self._watches[namespace] = w
+        items = self._items[namespace]
+        try:
+            for event in w.stream(
+                apps().list_namespaced_deployment,
+                namespace,
+                resource_version=resource_version,
+                allow_watch_bookmarks=True,
+                timeout_seconds=WATCH_TIMEOUT_SECONDS,
+                _request_timeout=WATCH_TIMEOUT_SECONDS + 30,
+            ):
+                if event["type"] in ("ADDED", "MODIFIED"):
+                    deployment = event["object"]
+                    items[deployment.metadata.name] = self._status(deployment)
+                elif event["type"] == "DELETED":
+                    items.pop(event["object"].metadata.name, None)
+        finally:
+            self._watches.pop(namespace, None)
+        # Watch tracks the newest resourceVersion from objects and bookmarks
+        return w.resource_version or resource_version
+
+replica_cache: Optional[ReplicaCache] = None
+
+def start_replica_cache(namespaces: Iterable[str]) -> ReplicaCache:
+    """Start watching deployments in `namespaces`; get_replicas reads from the cache from then on"""
+    global replica_cache
+    replica_cache = ReplicaCache(namespaces).start()
+    if not replica_cache.wait_synced():
+        print("[NimbusOps] Deployment cache not synced yet, reading replicas from the API meanwhile")
+    return replica_cache
 
 def scale_deployment(namespace: str, name: str, replicas: int):
     body = {
@@ -10,9 +199,23 @@ def scale_deployment(namespace: str, name: str, replicas: int):
         }
     }
 
-    apps.patch_namespaced_deployment_scale(
+    apps().patch_namespaced_deployment_scale(
         name=name,
         namespace=namespace,
         body=body
     )
 
+
+def get_replica_status(namespace: str, name: str) -> ReplicaStatus:
+    """Desired and ready replicas, from the watch cache when it covers the namespace"""
+    if replica_cache is not None:
+        status = replica_cache.get(namespace, name)
+        if status is not None:
+            return status
+
+    deployment = apps().read_namespaced_deployment(name=name, namespace=namespace)
+    return ReplicaCache._status(deployment)
+
+def get_replicas(namespace: str, name: str) -> int:
+    """Desired replicas as currently set on the deployment"""
+    return get_replica_status(namespace, name).replicas
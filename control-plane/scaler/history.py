@@ -0,0 +1,76 @@
+import os
+from typing import Optional
+
+import numpy as np
+
+# One week of per-minute samples (~200 KB per target)
+HISTORY_CAPACITY = int(os.getenv("HISTORY_CAPACITY", str(7 * 24 * 60)))
+
+SAMPLE = np.dtype([
+    ("timestamp", "f8"),
+    ("cpu", "f4"),
+    ("replicas", "i4"),
+    ("request_rate", "f4"),
+])
+
+class RingHistory:
+    """
+    Fixed-capacity ring buffer of aligned (timestamp, cpu, replicas,
+    request_rate) samples for one target.
+
+    Appends are O(1) and overwrite the oldest sample once full. Reads
+    select by wall-clock duration with a binary search on the timestamp
+    column, which stays sorted because samples are appended in time order.
+    """
+
+    def __init__(self, capacity: int = HISTORY_CAPACITY):
+        self.capacity = capacity
+        self._buf = np.zeros(capacity, dtype=SAMPLE)
+        self._head = 0  # next slot to write
+        self._size = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    def append(self, timestamp: float, cpu: float, replicas: int, request_rate: float = 0.0):
+        self._buf[self._head] = (timestamp, cpu, replicas, request_rate)
+        self._head = (self._head + 1) % self.capacity
+        self._size = min(self._size + 1, self.capacity)
+
+    def _segments(self):
+        """Stored samples as at most two chronological views, oldest first"""
+        if self._size < self.capacity:
+            return [self._buf[:self._size]]
+        return [self._buf[self._head:], self._buf[:self._head]]
+
+    def window(self, seconds: float, now: Optional[float] = None) -> np.ndarray:
+        """Samples with timestamp in (now - seconds, now], oldest first; now defaults to the newest sample"""
+        if self._size == 0:
+            return self._buf[:0]
+        if now is None:
+            now = self.latest()["timestamp"]
+
+        parts = []
+        for segment in self._segments():
+            ts = segment["timestamp"]
+            start = np.searchsorted(ts, now - seconds, side="right")
+            end = np.searchsorted(ts, now, side="right")
+            if end > start:
+                parts.append(segment[start:end])
+        if len(parts) == 1:
+            return parts[0]
+        return np.concatenate(parts) if parts else self._buf[:0]
+
+    def last(self, n: int) -> np.ndarray:
+        """Newest n samples, oldest first"""
+        n = min(n, self._size)
+        if n == 0:
+            return self._buf[:0]
+        start = (self._head - n) % self.capacity
+        if start < self._head:
+            return self._buf[start:self._head]
+        return np.concatenate([self._buf[start:], self._buf[:self._head]])
+
+    def latest(self) -> np.void:
+        return self._buf[(self._head - 1) % self.capacity]
+
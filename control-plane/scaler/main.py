@@ -5,46 +5,82 @@ from datetime import datetime
 from prometheus_client import start_http_server, Counter, Gauge, Histogram
 import threading
 import os
+from typing import Optional
 
-from prometheus_query import get_avg_cpu, get_memory_usage, get_request_rate
-from decision import decide_replicas_enhanced
-from deployment_scaler import scale_deployment
+from prometheus_query import get_all_metrics_batched, metric_unit
+from decision import CostAwareDecisionEngine, LATENCY_SLO_SECONDS
+from deployment_scaler import get_replica_status, start_replica_cache
+from actuator import ScaleActuator
+from state_store import StateStore, open_state_store
+from targets import TARGET_NAMESPACE, TARGET_NAMESPACES, Target, discover_targets
+from scheduler import LoopScheduler, start_wakeup_server
 
 # Configuration - UPDATED for Aurora inference
-NAMESPACE = os.getenv("TARGET_NAMESPACE", "aurora-system")
-DEPLOYMENT = os.getenv("TARGET_DEPLOYMENT", "aurora-inference")
 METRICS_PORT = int(os.getenv("METRICS_PORT", "8001"))
+INITIAL_REPLICAS = int(os.getenv("INITIAL_REPLICAS", "3"))
+# How often the target list is re-discovered
+TARGET_REFRESH_SECONDS = float(os.getenv("TARGET_REFRESH_SECONDS", "300"))
+
+TARGET_LABELS = ['namespace', 'deployment']
 
 # Prometheus metrics
 DECISIONS_TOTAL = Counter(
     'nimbusops_decisions_total',
     'Total number of scaling decisions',
-    ['action']
+    ['action'] + TARGET_LABELS
 )
 
 REPLICAS_GAUGE = Gauge(
     'nimbusops_current_replicas',
-    'Current number of replicas'
+    'Current number of replicas',
+    TARGET_LABELS
+)
+
+READY_REPLICAS_GAUGE = Gauge(
+    'nimbusops_ready_replicas',
+    'Ready replicas as seen by the deployment watch',
+    TARGET_LABELS
 )
 
 CPU_GAUGE = Gauge(
     'nimbusops_current_cpu',
-    'Current CPU usage'
+    'Current CPU usage',
+    TARGET_LABELS
 )
 
 PREDICTED_CPU_GAUGE = Gauge(
     'nimbusops_predicted_cpu',
-    'Predicted CPU usage'
+    'Predicted CPU usage',
+    TARGET_LABELS
 )
 
 COST_SAVINGS_GAUGE = Gauge(
     'nimbusops_cost_savings_usd_per_hour',
-    'Estimated cost savings USD/hour'
+    'Estimated cost savings USD/hour',
+    TARGET_LABELS
 )
 
 REQUEST_RATE_GAUGE = Gauge(
     'nimbusops_request_rate',
-    'Current request rate'
+    'Current request rate',
+    TARGET_LABELS
+)
+
+SIGNAL_REPLICAS_GAUGE = Gauge(
+    'nimbusops_signal_replicas',
+    'Replicas each scaling signal asks for (multi_signal mode)',
+    ['signal'] + TARGET_LABELS
+)
+
+FORECAST_MAE_GAUGE = Gauge(
+    'nimbusops_forecast_mae',
+    'Rolling mean absolute CPU forecast error at the prediction horizon',
+    ['forecaster'] + TARGET_LABELS
+)
+
+TARGETS_GAUGE = Gauge(
+    'nimbusops_targets',
+    'Number of deployments managed by this controller'
 )
 
 DECISION_LATENCY = Histogram(
@@ -52,13 +88,102 @@ DECISION_LATENCY = Histogram(
     'Decision latency in seconds'
 )
 
+class TargetState:
+    """Per-deployment controller state; each target gets its own engine and history"""
+
+    def __init__(self, target: Target, store: Optional[StateStore] = None):
+        self.engine = CostAwareDecisionEngine()
+        self.update_target(target)
+        self.current_replicas = target.replicas if target.replicas is not None else INITIAL_REPLICAS
+        self.ready_replicas = self.current_replicas
+        self.decision_history = []
+        self.signals = set()  # labels exported to SIGNAL_REPLICAS_GAUGE
+
+        if store is not None:
+            restored = store.restore_history(target.key, self.engine.history)
+            self.decision_history = store.recent_decisions(target.key)
+            if restored:
+                self.engine.warm_start()
+                print(f"[NimbusOps] Restored {restored} samples and {len(self.decision_history)} decisions for {target}")
+        self.sync_replicas()
+
+    def update_target(self, target: Target):
+        """Adopt a (re-)discovered target, including the latency SLO of its MLDeployment"""
+        self.target = target
+        # An SLO removed from the MLDeployment falls back to LATENCY_SLO_SECONDS
+        slo = target.latency_slo_seconds
+        self.engine.policies["default"]["latency_slo_seconds"] = LATENCY_SLO_SECONDS if slo is None else slo
+
+    def sync_replicas(self):
+        """Read the live replica count (watch cache, no API call); keep the last known value if unavailable"""
+        try:
+            status = get_replica_status(self.target.namespace, self.target.deployment)
+            self.current_replicas, self.ready_replicas = status.replicas, status.ready_replicas
+        except Exception as e:
+            print(f"[NimbusOps] Could not read replicas of {self.target}, assuming {self.current_replicas}: {e}")
+
+    def labels(self) -> dict:
+        return {"namespace": self.target.namespace, "deployment": self.target.deployment}
+
 class NimbusOpsController:
     def __init__(self):
-        # Get current replicas from environment or default
-        self.current_replicas = int(os.getenv("INITIAL_REPLICAS", "3"))
-        self.decision_history = []
+        self.targets = {}
+        self.last_discovery = 0.0
         self.running = True
-        print(f"[NimbusOps] Initialized with target: {NAMESPACE}/{DEPLOYMENT}")
+        self.store = open_state_store()
+        self.scheduler = LoopScheduler()
+        # Replica counts come from a deployment watch rather than one API read per target per tick
+        self.replica_cache = start_replica_cache(TARGET_NAMESPACES + [TARGET_NAMESPACE])
+        self.actuator = ScaleActuator(replica_cache=self.replica_cache)
+        self.refresh_targets()
+        print(f"[NimbusOps] Initialized with targets: {', '.join(map(str, self.targets_list()))}")
+
+    def targets_list(self):
+        return [state.target for state in self.targets.values()]
+
+    def refresh_targets(self):
+        """Re-discover targets, keeping engine state for those still present"""
+        try:
+            discovered = discover_targets()
+        except Exception as e:
+            print(f"[NimbusOps] Target discovery failed, keeping {len(self.targets)} known targets: {e}")
+            if not self.targets:
+                raise
+            return
+        self.last_discovery = time.monotonic()
+
+        current = {}
+        for target in discovered:
+            state = self.targets.get(target.key)
+            if state is None:
+                print(f"[NimbusOps] Managing {target}")
+                state = TargetState(target, self.store)
+            else:
+                state.update_target(target)
+            current[target.key] = state
+        for key in self.targets.keys() - current.keys():
+            print(f"[NimbusOps] No longer managing {self.targets[key].target}")
+            self.forget_target(self.targets[key])
+
+        self.targets = current
+        TARGETS_GAUGE.set(len(current))
+
+    def forget_target(self, state: TargetState):
+        for gauge in (REPLICAS_GAUGE, READY_REPLICAS_GAUGE, CPU_GAUGE, PREDICTED_CPU_GAUGE, COST_SAVINGS_GAUGE, REQUEST_RATE_GAUGE):
+            try:
+                gauge.remove(state.target.namespace, state.target.deployment)
+            except KeyError:
+                pass
+        for name in state.engine.forecasters:
+            try:
+                FORECAST_MAE_GAUGE.remove(name, state.target.namespace, state.target.deployment)
+            except KeyError:
+                pass
+        for signal in state.signals:
+            try:
+                SIGNAL_REPLICAS_GAUGE.remove(signal, state.target.namespace, state.target.deployment)
+            except KeyError:
+                pass
 
     def start_metrics_server(self):
         """Start Prometheus metrics server in background"""
@@ -69,77 +194,130 @@ class NimbusOpsController:
         thread = threading.Thread(target=run_server, daemon=True)
         thread.start()
 
-    def log_decision(self, decision: dict, action: str):
+    def log_decision(self, state: TargetState, decision: dict, action: str):
         """Log decision to history and metrics"""
-        self.decision_history.append({
+        state.decision_history.append({
             "timestamp": datetime.utcnow().isoformat(),
             "decision": decision,
             "action": action
         })
 
+        if self.store is not None:
+            self.store.record_decision(state.target.key, state.decision_history[-1])
+
         # Keep only last 100 decisions
-        if len(self.decision_history) > 100:
-            self.decision_history = self.decision_history[-50:]
+        if len(state.decision_history) > 100:
+            state.decision_history = state.decision_history[-50:]
 
         # Update metrics
-        DECISIONS_TOTAL.labels(action=action).inc()
-        REPLICAS_GAUGE.set(self.current_replicas)
-        CPU_GAUGE.set(decision.get("current_cpu", 0))
-        PREDICTED_CPU_GAUGE.set(decision.get("predicted_load", 0))
+        labels = state.labels()
+        DECISIONS_TOTAL.labels(action=action, **labels).inc()
+        REPLICAS_GAUGE.labels(**labels).set(state.current_replicas)
+        READY_REPLICAS_GAUGE.labels(**labels).set(state.ready_replicas)
+        CPU_GAUGE.labels(**labels).set(decision.get("current_cpu", 0))
+        PREDICTED_CPU_GAUGE.labels(**labels).set(decision.get("predicted_load", 0))
+
+        for name, mae in state.engine.forecast_errors().items():
+            if mae is not None:
+                FORECAST_MAE_GAUGE.labels(forecaster=name, **labels).set(mae)
+
+        for signal, replicas in (decision.get("signal_replicas") or {}).items():
+            SIGNAL_REPLICAS_GAUGE.labels(signal=signal, **labels).set(replicas)
+            state.signals.add(signal)
 
         savings = decision.get("cost_impact", {}).get("cost_difference_usd_per_hour", 0)
         if savings > 0:
-            COST_SAVINGS_GAUGE.set(savings)
+            COST_SAVINGS_GAUGE.labels(**labels).set(savings)
 
         # Log to console
-        print(f"[NimbusOps] Decision: {json.dumps(decision, indent=2, default=str)}")
+        print(f"[NimbusOps] {state.target} decision: {json.dumps(decision, indent=2, default=str)}")
+
+    def reconcile(self, state: TargetState, metrics: dict) -> bool:
+        """Decide and act for one target from this tick's metrics; True if it needs a quick follow-up"""
+        target = state.target
+        state.sync_replicas()
+        cpu = metrics["cpu_usage"]
+
+        # Also get request rate for better decisions
+        request_rate = metrics["request_rate"]
+        REQUEST_RATE_GAUGE.labels(**state.labels()).set(request_rate)
+
+        # Make enhanced decision; memory and latency only matter in multi_signal mode
+        decision = state.engine.decide_replicas(state.current_replicas, cpu, {
+            "request_rate": request_rate,
+            "request_rate_unit": metric_unit("request_rate", target.key),
+            "memory_usage": metrics["memory_usage"],
+            "latency_p95": metrics["latency_p95"],
+        })
+        desired = decision["replicas"]
+        needs_attention = state.engine.needs_attention(decision, state.current_replicas)
+
+        if self.store is not None:
+            self.store.record_sample(target.key, *state.engine.history.latest())
+
+        # Take action if needed
+        if desired != state.current_replicas:
+            print(f"[NimbusOps] Scaling {target} {state.current_replicas} → {desired}")
+            print(f"[NimbusOps] Reason: {decision['decision_reason']}")
+
+            # Patched asynchronously (coalesced, rate-limited, retried); the watch cache shows the outcome
+            self.actuator.submit(target.namespace, target.deployment, desired)
+            if self.actuator.dry_run:
+                self.log_decision(state, decision, "dry_run")
+            else:
+                state.current_replicas = desired
+                self.log_decision(state, decision, "scaled")
+        else:
+            print(f"[NimbusOps] No change for {target} (cpu={cpu:.3f}, predicted={decision['predicted_load']:.3f}, req_rate={request_rate:.2f})")
+            self.log_decision(state, decision, "no_change")
+
+        return needs_attention
 
     def run(self):
         print("[NimbusOps] Enhanced Controller starting...")
-        print(f"[NimbusOps] Monitoring {DEPLOYMENT} in {NAMESPACE}")
+        print(f"[NimbusOps] Monitoring {len(self.targets)} deployment(s)")
         print(f"[NimbusOps] Metrics endpoint: :{METRICS_PORT}/metrics")
+        if self.actuator.dry_run:
+            print("[NimbusOps] DRY_RUN: decisions are logged, no deployment is patched")
 
         # Start metrics server
         self.start_metrics_server()
+        start_wakeup_server(self.scheduler)
 
         while self.running:
             try:
+                if time.monotonic() - self.last_discovery >= TARGET_REFRESH_SECONDS:
+                    self.refresh_targets()
+
+                needs_attention = False
                 with DECISION_LATENCY.time():
-                    # Get current metrics
-                    cpu = get_avg_cpu(NAMESPACE, DEPLOYMENT)
-                    
-                    # Also get request rate for better decisions
-                    request_rate = get_request_rate(NAMESPACE, DEPLOYMENT)
-                    REQUEST_RATE_GAUGE.set(request_rate)
-
-                    # Make enhanced decision
-                    decision = decide_replicas_enhanced(self.current_replicas, cpu)
-                    desired = decision["replicas"]
-
-                    # Take action if needed
-                    if desired != self.current_replicas:
-                        print(f"[NimbusOps] Scaling {self.current_replicas} → {desired}")
-                        print(f"[NimbusOps] Reason: {decision['decision_reason']}")
+                    # One grouped query per metric covers every target
+                    metrics = get_all_metrics_batched(list(self.targets))
 
+                    for key, state in self.targets.items():
                         try:
-                            scale_deployment(NAMESPACE, DEPLOYMENT, desired)
-                            self.current_replicas = desired
-                            self.log_decision(decision, "scaled")
-                        except Exception as scale_error:
-                            print(f"[NimbusOps] Scale failed: {scale_error}")
-                            self.log_decision(decision, "failed")
-                    else:
-                        print(f"[NimbusOps] No change (cpu={cpu:.3f}, predicted={decision['predicted_load']:.3f}, req_rate={request_rate:.2f})")
-                        self.log_decision(decision, "no_change")
+                            needs_attention |= self.reconcile(state, metrics[key])
+                        except Exception as e:
+                            print(f"[NimbusOps] ERROR reconciling {state.target}: {e}")
+                            traceback.print_exc()
+
+                interval = self.scheduler.update(needs_attention)
+                print(f"[NimbusOps] Next check in {interval:.0f}s")
 
             except Exception as e:
                 print(f"[NimbusOps] ERROR in main loop: {e}")
                 traceback.print_exc()
 
-            time.sleep(60)  # Check every minute
+            # Adaptive interval; a wake-up webhook ends the wait early
+            self.scheduler.wait()
 
     def stop(self):
         self.running = False
+        self.scheduler.wake("shutdown")
+        self.actuator.stop()
+        self.replica_cache.stop()
+        if self.store is not None:
+            self.store.close()
 
 if __name__ == "__main__":
     controller = NimbusOpsController()
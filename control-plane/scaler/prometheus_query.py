@@ -1,20 +1,65 @@
 import requests
 import os
-from typing import List, Dict, Any
+import re
+from concurrent.futures import ThreadPoolExecutor, wait
+from typing import Callable, List, Dict, Any, Optional, Tuple
 import time
+import threading
+from prometheus_client import Gauge, Histogram
+from requests.adapters import HTTPAdapter
 
 PROM_URL = os.getenv(
     "PROMETHEUS_URL",
     "http://prometheus.monitoring.svc.cluster.local:9090"
 )
 
-def query(promql: str) -> List[Dict[str, Any]]:
+# Per-HTTP-call timeout, and the budget for one metric across all its PromQL variants
+QUERY_TIMEOUT_SECONDS = float(os.getenv("PROM_QUERY_TIMEOUT", "10"))
+METRIC_DEADLINE_SECONDS = float(os.getenv("PROM_METRIC_DEADLINE", "10"))
+# Budget for fetching every metric of one control-loop tick
+FETCH_DEADLINE_SECONDS = float(os.getenv("PROM_FETCH_DEADLINE", "15"))
+FETCH_WORKERS = int(os.getenv("PROM_FETCH_WORKERS", "8"))
+# How long a PromQL variant that returned data is trusted before re-probing from the first one
+VARIANT_TTL_SECONDS = float(os.getenv("PROM_VARIANT_TTL", "3600"))
+
+METRIC_FETCH_LATENCY = Histogram(
+    'nimbusops_metric_fetch_seconds',
+    'Time to fetch one scaling metric from Prometheus',
+    ['metric']
+)
+
+PROMQL_VARIANT = Gauge(
+    'nimbusops_promql_variant_selected',
+    'PromQL fallback variant currently used for a metric (1 = selected)',
+    ['metric', 'namespace', 'deployment', 'variant']
+)
+
+# One pooled keep-alive session shared by all fetcher threads
+session = requests.Session()
+session.mount("http://", HTTPAdapter(pool_connections=1, pool_maxsize=FETCH_WORKERS))
+session.mount("https://", HTTPAdapter(pool_connections=1, pool_maxsize=FETCH_WORKERS))
+
+_fetch_pool = ThreadPoolExecutor(max_workers=FETCH_WORKERS, thread_name_prefix="prom-fetch")
+
+def _deadline() -> float:
+    return time.monotonic() + METRIC_DEADLINE_SECONDS
+
+def _remaining(deadline: Optional[float]) -> float:
+    if deadline is None:
+        return QUERY_TIMEOUT_SECONDS
+    return min(QUERY_TIMEOUT_SECONDS, deadline - time.monotonic())
+
+def query(promql: str, deadline: Optional[float] = None) -> List[Dict[str, Any]]:
     """Execute PromQL query and return results"""
+    timeout = _remaining(deadline)
+    if timeout <= 0:
+        return []
+
     try:
-        resp = requests.get(
+        resp = session.get(
             f"{PROM_URL}/api/v1/query",
             params={"query": promql},
-            timeout=10
+            timeout=timeout
         )
         resp.raise_for_status()
 
@@ -27,167 +72,316 @@ def query(promql: str) -> List[Dict[str, Any]]:
         print(f"[Prometheus] Query failed: {e}")
         return []
 
-def get_avg_cpu(namespace: str, deployment: str) -> float:
-    """Get average CPU usage for deployment"""
-    # Try different container name patterns
-    promql_variations = [
-        f'''
-        avg(
-          rate(container_cpu_usage_seconds_total{{
-            namespace="{namespace}",
-            pod=~"{deployment}.*",
-            container!="POD",
-            container!=""
-          }}[2m])
-        )
-        ''',
-        f'''
-        avg(
-          rate(container_cpu_usage_seconds_total{{
-            namespace="{namespace}",
-            pod=~"{deployment}.*"
-          }}[2m])
-        ) by (pod)
-        ''',
-        # Fallback to node-exporter metrics
-        f'''
-        sum(
-          rate(node_namespace_pod_container:container_cpu_usage_seconds_total:sum_rate{{
-            namespace="{namespace}",
-            pod=~"{deployment}.*"
-          }}[2m])
-        )
-        '''
-    ]
-    
-    for promql in promql_variations:
-        results = query(promql)
-        if results:
-            try:
-                # Handle different result formats
-                if isinstance(results, list):
-                    if len(results) == 0:
-                        continue
-                    if "value" in results[0]:
-                        return float(results[0]["value"][1])
-                    elif "values" in results[0]:
-                        return float(results[0]["values"][-1][1])
-                elif isinstance(results, dict):
-                    return float(results.get("value", [0, 0])[1])
-            except (ValueError, KeyError, IndexError, TypeError):
+class VariantProber:
+    """
+    Remembers which PromQL fallback variant returns data for each
+    (metric, namespace, deployment), so later ticks issue one query
+    instead of walking the list. Probing restarts from the first variant
+    when the remembered one stops returning data or its TTL expires.
+    """
+
+    def __init__(self, ttl_seconds: float = VARIANT_TTL_SECONDS):
+        self.ttl_seconds = ttl_seconds
+        self._selected: Dict[tuple, tuple] = {}
+        self._lock = threading.Lock()
+
+    def run_batched(self, metric: str, keys: List[Tuple[str, str]],
+                    variations: Callable[[List[Tuple[str, str]]], List[str]],
+                    split: Callable[[Any, List[Tuple[str, str]]], Dict[tuple, Any]],
+                    deadline: Optional[float] = None) -> Dict[tuple, Tuple[int, Any]]:
+        """
+        (variant index, value) per (namespace, deployment) target, fetched
+        with queries over many targets at once. `variations(keys)` builds
+        the variants for a subset of targets and `split` maps a result onto
+        them. Targets sharing a remembered variant are queried together;
+        any target a variant returns nothing for falls through to the next
+        variant on its own, so one target's data never masks another's gap.
+        """
+        now = time.monotonic()
+        by_variant: Dict[int, list] = {}
+        previous: Dict[tuple, tuple] = {}
+        with self._lock:
+            for target in keys:
+                selected = self._selected.get((metric, *target))
+                if selected is not None:
+                    previous[target] = selected
+                    if now - selected[1] < self.ttl_seconds:
+                        by_variant.setdefault(selected[0], []).append(target)
+
+        found: Dict[tuple, Tuple[int, Any]] = {}
+        tried: Dict[tuple, int] = {}
+        for index, group in sorted(by_variant.items()):
+            values = split(query(variations(group)[index], deadline), group)
+            for target in group:
+                tried[target] = index
+                if target in values:
+                    found[target] = (index, values[target])
+                else:
+                    print(f"[Prometheus] {metric} variant {index} returned no data for {'/'.join(target)}, re-probing")
+
+        for index in range(len(variations(keys))):
+            group = [target for target in keys if target not in found and tried.get(target) != index]
+            if not group:
                 continue
-    
-    return 0.0
+            values = split(query(variations(group)[index], deadline), group)
+            for target, value in values.items():
+                found[target] = (index, value)
+                self._select((metric, *target), index, previous.get(target))
 
-def get_memory_usage(namespace: str, deployment: str) -> float:
-    """Get average memory usage in percentage"""
-    promql = f'''
-    avg(
-      container_memory_working_set_bytes{{
-        namespace="{namespace}",
-        pod=~"{deployment}.*",
-        container!="POD"
-      }} /
-      kube_pod_container_resource_limits{{
-        namespace="{namespace}",
-        pod=~"{deployment}.*",
-        resource="memory"
-      }}
-    )
-    '''
+        for target in keys:
+            if target not in found:
+                self._forget((metric, *target), previous.get(target))
+        return found
+
+    def selected(self, metric: str, namespace: str, deployment: str) -> Optional[int]:
+        """Index of the variant currently remembered for a target, if any"""
+        with self._lock:
+            selected = self._selected.get((metric, namespace, deployment))
+        return None if selected is None else selected[0]
 
-    results = query(promql)
-    if not results:
-        return 0.0
+    def retain(self, keys: List[Tuple[str, str]]):
+        """Forget remembered variants (and their gauge series) of targets no longer in `keys`"""
+        wanted = set(keys)
+        with self._lock:
+            stale = {key: selected for key, selected in self._selected.items() if tuple(key[1:]) not in wanted}
+        for key, selected in stale.items():
+            self._forget(key, selected)
 
+    def _select(self, key: tuple, index: int, previous: Optional[tuple]):
+        with self._lock:
+            self._selected[key] = (index, time.monotonic())
+        if previous is not None and previous[0] != index:
+            _remove_series(key, previous[0])
+        PROMQL_VARIANT.labels(*key, str(index)).set(1)
+
+    def _forget(self, key: tuple, previous: Optional[tuple]):
+        with self._lock:
+            self._selected.pop(key, None)
+        if previous is not None:
+            _remove_series(key, previous[0])
+
+def _remove_series(key: tuple, index: int):
     try:
-        if results and "value" in results[0]:
-            value = float(results[0]["value"][1])
-            return value * 100  # Convert to percentage
-    except (ValueError, KeyError, IndexError):
+        PROMQL_VARIANT.remove(*key, str(index))
+    except KeyError:
         pass
 
-    return 0.0
+variant_prober = VariantProber()
 
-def get_request_rate(namespace: str, deployment: str) -> float:
-    """Get HTTP request rate per second"""
-    # Try to get request rate from inference service
-    promql_variations = [
-        f'''
-        sum(
-          rate(nginx_ingress_controller_requests{{
-            namespace="{namespace}",
-            ingress=~".*inference.*"
-          }}[2m])
-        )
-        ''',
-        f'''
-        sum(
-          rate(container_network_receive_bytes_total{{
-            namespace="{namespace}",
-            pod=~"{deployment}.*"
-          }}[2m])
-        ) / 1024  # Convert to KB/s
-        ''',
-        f'''
-        sum(
-          rate(istio_requests_total{{
-            destination_service_namespace="{namespace}",
-            destination_service_name=~".*inference.*"
-          }}[2m])
+# ---------------- Batched multi-target queries ----------------
+# Each metric is one query for every target: a per-pod expression joined to
+# its owning Deployment through kube-state-metrics and aggregated
+# `by (namespace, deployment)`. Without kube-state-metrics the per-pod
+# vector is fetched as-is and pods are attributed by name instead.
+Key = Tuple[str, str]
+
+# Pods of a Deployment are named <deployment>-<pod-template-hash>-<suffix>
+POD_NAME = re.compile(r"^(?P<deployment>.+)-[a-z0-9]+-[a-z0-9]+$")
+
+def _mean(values: List[float]) -> float:
+    return sum(values) / len(values)
+
+# per_pod: PromQL templates grouped by (namespace, pod), tried in order
+# aggregate/combine: how a deployment's pods reduce to one value, in PromQL and in Python
+# scale: unit conversion applied to the parsed value
+# units: unit of each per_pod template's result, when the fallbacks measure something else
+BATCHED_METRICS = {
+    "cpu_usage": {
+        "per_pod": [
+            'sum by (namespace, pod) (rate(container_cpu_usage_seconds_total{{{selector}, container!="POD", container!=""}}[2m]))',
+            'sum by (namespace, pod) (rate(container_cpu_usage_seconds_total{{{selector}}}[2m]))',
+            'sum by (namespace, pod) (node_namespace_pod_container:container_cpu_usage_seconds_total:sum_rate{{{selector}}})',
+        ],
+        "aggregate": "avg", "combine": _mean, "scale": 1.0,
+    },
+    "memory_usage": {
+        "per_pod": [
+            'sum by (namespace, pod) (container_memory_working_set_bytes{{{selector}, container!="POD", container!=""}})'
+            ' / sum by (namespace, pod) (kube_pod_container_resource_limits{{{selector}, resource="memory"}})',
+        ],
+        "aggregate": "avg", "combine": _mean, "scale": 100.0,  # percentage
+    },
+    "request_rate": {
+        "per_pod": [
+            'sum by (namespace, pod) (rate(istio_requests_total{{{selector}, reporter="destination"}}[2m]))',
+            'sum by (namespace, pod) (rate(container_network_receive_bytes_total{{{selector}}}[2m])) / 1024',  # KB/s
+        ],
+        "units": ["req/s", "KB/s"],
+        "aggregate": "sum", "combine": sum, "scale": 1.0,
+    },
+    "latency_p95": {
+        "per_pod": [
+            'sum by (namespace, pod, le) (rate(istio_request_duration_milliseconds_bucket{{{selector}, reporter="destination"}}[2m]))',
+        ],
+        # Without the owner join each pod gets its own quantile; report the slowest
+        "quantile": 0.95, "combine": max, "scale": 0.001,  # ms -> s
+    },
+}
+
+def _alternation(values) -> str:
+    return "|".join(sorted(set(values)))
+
+def pod_selector(keys: List[Key]) -> str:
+    namespaces = _alternation(ns for ns, _ in keys)
+    deployments = _alternation(dep for _, dep in keys)
+    return f'namespace=~"{namespaces}", pod=~"({deployments})-.*"'
+
+def pod_owners(keys: List[Key]) -> str:
+    """1 per (namespace, pod, deployment) for pods whose ReplicaSet belongs to one of the targets"""
+    namespaces = _alternation(ns for ns, _ in keys)
+    deployments = _alternation(dep for _, dep in keys)
+    return f'''max by (namespace, pod, deployment) (
+      label_replace(
+        label_replace(
+          kube_pod_owner{{namespace=~"{namespaces}", owner_kind="ReplicaSet"}},
+          "replicaset", "$1", "owner_name", "(.*)"
         )
-        '''
-    ]
-
-    for promql in promql_variations:
-        results = query(promql)
-        if results:
-            try:
-                if results and "value" in results[0]:
-                    return float(results[0]["value"][1])
-            except (ValueError, KeyError, IndexError):
+        * on (namespace, replicaset) group_left(owner_name)
+        max by (namespace, replicaset, owner_name) (
+          kube_replicaset_owner{{namespace=~"{namespaces}", owner_kind="Deployment", owner_name=~"{deployments}"}}
+        ),
+        "deployment", "$1", "owner_name", "(.*)"
+      )
+    )'''
+
+def batched_queries(name: str, keys: List[Key]) -> List[str]:
+    """PromQL variants for one metric over all targets, grouped by deployment first"""
+    spec = BATCHED_METRICS[name]
+    owners = pod_owners(keys)
+    grouped, by_pod = [], []
+
+    for template in spec["per_pod"]:
+        per_pod = template.format(selector=pod_selector(keys))
+        joined = f"({per_pod}) * on (namespace, pod) group_left(deployment) {owners}"
+        if "quantile" in spec:
+            grouped.append(f'histogram_quantile({spec["quantile"]}, sum by (namespace, deployment, le) ({joined}))')
+            by_pod.append(f'histogram_quantile({spec["quantile"]}, {per_pod})')
+        else:
+            grouped.append(f'{spec["aggregate"]} by (namespace, deployment) ({joined})')
+            by_pod.append(per_pod)
+
+    return grouped + by_pod
+
+def split_by_target(results: List[Dict[str, Any]], keys: List[Key], combine=_mean) -> Dict[Key, float]:
+    """
+    Split a result vector into one value per target. Series carry either a
+    `deployment` label (owner-joined queries) or only `pod`, in which case
+    pods are attributed by name and combined per target.
+    """
+    wanted = set(keys)
+    samples: Dict[Key, List[float]] = {}
+
+    for series in results or []:
+        labels = series.get("metric", {})
+        deployment = labels.get("deployment")
+        if deployment is None:
+            match = POD_NAME.match(labels.get("pod", ""))
+            if not match:
                 continue
+            deployment = match.group("deployment")
+        key = (labels.get("namespace"), deployment)
+        if key not in wanted:
+            continue
+        try:
+            value = float(series["value"][1])
+        except (ValueError, KeyError, IndexError, TypeError):
+            continue
+        if value == value:  # drop NaN from empty histograms / zero limits
+            samples.setdefault(key, []).append(value)
 
-    return 0.0
+    return {key: combine(values) for key, values in samples.items()}
 
-def get_latency_p95(namespace: str, deployment: str) -> float:
-    """Get 95th percentile latency in seconds"""
-    promql = f'''
-    histogram_quantile(0.95,
-      sum(
-        rate(istio_request_duration_milliseconds_bucket{{
-          destination_service_namespace="{namespace}",
-          destination_service_name=~".*inference.*"
-        }}[2m])
-      ) by (le)
-    ) / 1000  # Convert to seconds
-    '''
-
-    results = query(promql)
-    if not results:
-        return 0.0
+def fetch_batched(name: str, keys: List[Key], deadline: Optional[float] = None) -> Dict[Key, float]:
+    """One metric for every (namespace, deployment) target; targets without data are absent"""
+    spec = BATCHED_METRICS[name]
+    found = variant_prober.run_batched(
+        name, keys,
+        lambda subset: batched_queries(name, subset),
+        lambda results, subset: split_by_target(results, subset, spec["combine"]),
+        deadline or _deadline(),
+    )
+    return {key: value * spec["scale"] for key, (_, value) in found.items()}
 
-    try:
-        if results and "value" in results[0]:
-            return float(results[0]["value"][1])
-    except (ValueError, KeyError, IndexError):
-        pass
+def metric_unit(name: str, key: Key) -> Optional[str]:
+    """Unit of the variant last used for a target's metric; None without data or declared units"""
+    spec = BATCHED_METRICS[name]
+    index = variant_prober.selected(name, *key)
+    if index is None or "units" not in spec:
+        return None
+    # Variants are the owner-grouped queries followed by the by-pod ones, per_pod order in each
+    return spec["units"][index % len(spec["per_pod"])]
 
-    return 0.0
+def _timed_fetch(name: str, keys: List[Key], deadline: float) -> Dict[Key, float]:
+    with METRIC_FETCH_LATENCY.labels(metric=name).time():
+        return fetch_batched(name, keys, deadline)
 
-def get_all_metrics(namespace: str, deployment: str) -> Dict[str, float]:
-    """Get all relevant metrics at once"""
-    return {
-        "cpu_usage": get_avg_cpu(namespace, deployment),
-        "memory_usage": get_memory_usage(namespace, deployment),
-        "request_rate": get_request_rate(namespace, deployment),
-        "latency_p95": get_latency_p95(namespace, deployment)
+def get_all_metrics_batched(keys: List[Key]) -> Dict[Key, Dict[str, float]]:
+    """
+    Every metric for every target: one grouped query per metric, fetched
+    concurrently within one loop deadline. Missing values are 0.0.
+    """
+    keys = list(keys)
+    # The full target list: variants remembered for targets outside it are dropped
+    variant_prober.retain(keys)
+    return _fetch_all(keys)
+
+def _fetch_all(keys: List[Key]) -> Dict[Key, Dict[str, float]]:
+    start = time.monotonic()
+    metric_deadline = start + min(METRIC_DEADLINE_SECONDS, FETCH_DEADLINE_SECONDS)
+
+    futures = {
+        name: _fetch_pool.submit(_timed_fetch, name, keys, metric_deadline)
+        for name in BATCHED_METRICS
     }
+    wait(futures.values(), timeout=FETCH_DEADLINE_SECONDS)
+
+    metrics = {key: {name: 0.0 for name in BATCHED_METRICS} for key in keys}
+    for name, future in futures.items():
+        if not future.done():
+            print(f"[Prometheus] {name} missed the {FETCH_DEADLINE_SECONDS:g}s fetch deadline")
+            future.cancel()
+            continue
+        try:
+            per_target = future.result()
+        except Exception as e:
+            print(f"[Prometheus] {name} fetch failed: {e}")
+            continue
+        for key, value in per_target.items():
+            metrics[key][name] = value
+
+    return metrics
+
+# ---------------- Single-target wrappers ----------------
+def _single(name: str, namespace: str, deployment: str, deadline: Optional[float]) -> float:
+    key = (namespace, deployment)
+    return fetch_batched(name, [key], deadline).get(key, 0.0)
+
+def get_avg_cpu(namespace: str, deployment: str, deadline: Optional[float] = None) -> float:
+    """Get average CPU usage for deployment"""
+    return _single("cpu_usage", namespace, deployment, deadline)
+
+def get_memory_usage(namespace: str, deployment: str, deadline: Optional[float] = None) -> float:
+    """Get average memory usage in percentage"""
+    return _single("memory_usage", namespace, deployment, deadline)
+
+def get_request_rate(namespace: str, deployment: str, deadline: Optional[float] = None) -> float:
+    """Get HTTP request rate per second"""
+    return _single("request_rate", namespace, deployment, deadline)
+
+def get_latency_p95(namespace: str, deployment: str, deadline: Optional[float] = None) -> float:
+    """Get 95th percentile latency in seconds"""
+    return _single("latency_p95", namespace, deployment, deadline)
+
+def get_all_metrics(namespace: str, deployment: str) -> Dict[str, float]:
+    """Get all relevant metrics at once, fetched concurrently within one loop deadline"""
+    key = (namespace, deployment)
+    # Not get_all_metrics_batched: one target must not reset the others' remembered variants
+    return _fetch_all([key])[key]
 
 def check_prometheus_health() -> bool:
     """Check if Prometheus is reachable"""
     try:
-        resp = requests.get(f"{PROM_URL}/-/healthy", timeout=5)
+        resp = session.get(f"{PROM_URL}/-/healthy", timeout=5)
         return resp.status_code == 200
     except:
         return False
@@ -0,0 +1,119 @@
+import os
+import json
+import time
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from prometheus_client import Counter, Gauge
+
+LOOP_INTERVAL_SECONDS = float(os.getenv("LOOP_INTERVAL_SECONDS", "60"))
+LOOP_MIN_INTERVAL_SECONDS = float(os.getenv("LOOP_MIN_INTERVAL_SECONDS", "10"))
+LOOP_MAX_INTERVAL_SECONDS = float(os.getenv("LOOP_MAX_INTERVAL_SECONDS", "120"))
+# Growth factor of the interval per calm tick
+LOOP_BACKOFF = float(os.getenv("LOOP_BACKOFF", "1.5"))
+# Floor between two wake-up-triggered ticks, so a burst of webhooks can't spin the loop
+WAKEUP_MIN_SPACING_SECONDS = float(os.getenv("WAKEUP_MIN_SPACING_SECONDS", "1"))
+WAKEUP_PORT = int(os.getenv("WAKEUP_PORT", "8002"))
+
+# Accepted values of the "source" field; anything else is counted as "webhook"
+WAKEUP_SOURCES = ("inference", "webhook")
+
+LOOP_INTERVAL_GAUGE = Gauge(
+    'nimbusops_loop_interval_seconds',
+    'Current control-loop interval'
+)
+
+WAKEUPS_TOTAL = Counter(
+    'nimbusops_wakeups_total',
+    'Immediate control-loop wake-ups',
+    ['source']
+)
+
+class LoopScheduler:
+    """
+    Decides when the control loop runs next.
+
+    The interval drops to the minimum while any target needs attention and
+    grows by LOOP_BACKOFF per calm tick up to the maximum. `wake()` ends
+    the current wait immediately.
+    """
+
+    def __init__(
+        self,
+        base_interval: float = LOOP_INTERVAL_SECONDS,
+        min_interval: float = LOOP_MIN_INTERVAL_SECONDS,
+        max_interval: float = LOOP_MAX_INTERVAL_SECONDS,
+        backoff: float = LOOP_BACKOFF,
+    ):
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.backoff = backoff
+        self.interval = max(min_interval, min(max_interval, base_interval))
+        self._wakeup = threading.Event()
+        # The first tick runs right away in the caller; the first wait covers a full interval after it
+        self._last_tick = time.monotonic()
+        LOOP_INTERVAL_GAUGE.set(self.interval)
+
+    def update(self, needs_attention: bool) -> float:
+        if needs_attention:
+            self.interval = self.min_interval
+        else:
+            self.interval = min(self.max_interval, self.interval * self.backoff)
+        LOOP_INTERVAL_GAUGE.set(self.interval)
+        return self.interval
+
+    def wake(self, source: str):
+        WAKEUPS_TOTAL.labels(source=source).inc()
+        self._wakeup.set()
+
+    def wait(self) -> bool:
+        """Sleep until the next tick; True if a wake-up cut the wait short"""
+        woken = self._wakeup.wait(timeout=max(0.0, self._last_tick + self.interval - time.monotonic()))
+        if woken:
+            time.sleep(max(0.0, self._last_tick + WAKEUP_MIN_SPACING_SECONDS - time.monotonic()))
+            self._wakeup.clear()
+        self._last_tick = time.monotonic()
+        return woken
+
+def start_wakeup_server(scheduler: LoopScheduler, port: int = WAKEUP_PORT) -> ThreadingHTTPServer:
+    """
+    POST /wakeup runs the control loop now. Accepts an Alertmanager webhook
+    (only firing notifications wake the loop) or any JSON with a "source".
+    """
+
+    class Handler(BaseHTTPRequestHandler):
+        def log_message(self, *args):
+            pass
+
+        def do_POST(self):
+            if self.path.rstrip("/") != "/wakeup":
+                self.send_error(404)
+                return
+
+            length = int(self.headers.get("Content-Length") or 0)
+            try:
+                payload = json.loads(self.rfile.read(length) or b"{}")
+            except ValueError:
+                payload = {}
+            if not isinstance(payload, dict):
+                payload = {}
+
+            if "alerts" in payload:
+                source = "alertmanager"
+                firing = payload.get("status") == "firing"
+            else:
+                source = payload.get("source") if payload.get("source") in WAKEUP_SOURCES else "webhook"
+                firing = True
+
+            if firing:
+                print(f"[NimbusOps] Wake-up from {source}: {payload.get('reason', payload.get('groupLabels', ''))}")
+                scheduler.wake(source)
+
+            self.send_response(202)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+
+    server = ThreadingHTTPServer(("", port), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True, name="wakeup-server").start()
+    print(f"[NimbusOps] Wake-up webhook listening on :{port}/wakeup")
+    return server
@@ -0,0 +1,189 @@
+"""
+Offline replay of a recorded load series through the decision engine.
+
+    python simulate.py cpu.csv --startup-delay 90 --policy policy.json
+
+Input is a CSV or Parquet file with `timestamp` (unix seconds or ISO-8601)
+and `cpu` columns, plus optional `request_rate` and `replicas` columns. A
+Prometheus `query_range` JSON export also works; with one series per pod,
+`cpu` is the per-pod mean and `replicas` is the number of series. CPU is
+treated as per-pod utilisation at the recorded replica count, so total
+demand = cpu * replicas is what the simulated deployment has to serve.
+"""
+import sys
+import json
+import argparse
+from collections import deque
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+from decision import CostAwareDecisionEngine
+
+class SimulatedClock:
+    def __init__(self, start: float):
+        self.now = start
+
+    def __call__(self) -> float:
+        return self.now
+
+# ---------------- Input ----------------
+def load_query_range(path: str) -> pd.DataFrame:
+    with open(path) as f:
+        series = json.load(f)["data"]["result"]
+    if not series:
+        raise ValueError(f"{path} contains no series")
+
+    frames = [
+        pd.DataFrame(s["values"], columns=["timestamp", "cpu"]).astype(float)
+        for s in series
+    ]
+    merged = pd.concat(frames)
+    grouped = merged.groupby("timestamp")["cpu"]
+    frame = grouped.mean().to_frame()
+    if len(series) > 1:
+        frame["replicas"] = grouped.count()
+    return frame.reset_index()
+
+def load_series(path: str) -> pd.DataFrame:
+    if path.endswith(".json"):
+        frame = load_query_range(path)
+    elif path.endswith(".parquet"):
+        frame = pd.read_parquet(path)
+    else:
+        frame = pd.read_csv(path)
+
+    if "timestamp" not in frame or "cpu" not in frame:
+        raise ValueError(f"{path} needs 'timestamp' and 'cpu' columns")
+    if not np.issubdtype(frame["timestamp"].dtype, np.number):
+        frame["timestamp"] = pd.to_datetime(frame["timestamp"], utc=True).astype("int64") / 1e9
+    return frame.sort_values("timestamp").reset_index(drop=True)
+
+# ---------------- Simulation ----------------
+def simulate(
+    frame: pd.DataFrame,
+    engine: Optional[CostAwareDecisionEngine] = None,
+    interval: float = 60,
+    startup_delay: float = 90,
+    initial_replicas: int = 3,
+    recorded_replicas: int = 1,
+    slo_cpu: float = 0.9,
+    profile: str = "gcp_e2_medium",
+) -> dict:
+    """Run the engine every `interval` seconds of recorded time and score the outcome"""
+    ts = frame["timestamp"].to_numpy(dtype=np.float64)
+    replicas = frame["replicas"].to_numpy(dtype=np.float64) if "replicas" in frame else recorded_replicas
+    demand = frame["cpu"].to_numpy(dtype=np.float64) * replicas
+    request_rate = frame["request_rate"].to_numpy(dtype=np.float64) if "request_rate" in frame else np.zeros(len(ts))
+
+    clock = SimulatedClock(ts[0])
+    if engine is None:
+        engine = CostAwareDecisionEngine(clock=clock)
+    else:
+        engine.clock = clock
+
+    provisioned = ready = initial_replicas
+    starting = deque()  # (ready_at, pods) for pods still starting, oldest first
+    # Step function of (time, ready, provisioned); one entry per change
+    changes = [(ts[0], ready, provisioned)]
+    scale_ups = scale_downs = decisions = 0
+
+    for now in np.arange(ts[0], ts[-1] + interval / 2, interval).tolist():
+        clock.now = now
+        while starting and starting[0][0] <= now:
+            ready_at, pods = starting.popleft()
+            ready += pods
+            changes.append((ready_at, ready, provisioned))
+
+        i = np.searchsorted(ts, now, side="right") - 1
+        cpu = demand[i] / max(ready, 1)
+        decision = engine.decide_replicas(provisioned, cpu, {"request_rate": request_rate[i]})
+        decisions += 1
+        desired = decision["replicas"]
+
+        if desired > provisioned:
+            starting.append((now + startup_delay, desired - provisioned))
+            scale_ups += 1
+        elif desired < provisioned:
+            # Pods still starting are cancelled before ready ones are removed
+            remove = provisioned - desired
+            while remove and starting:
+                ready_at, pods = starting.pop()
+                cancelled = min(pods, remove)
+                remove -= cancelled
+                if pods > cancelled:
+                    starting.append((ready_at, pods - cancelled))
+            ready -= remove
+            scale_downs += 1
+        if desired != provisioned:
+            provisioned = desired
+            changes.append((now, ready, provisioned))
+
+    # Score every recorded sample against the replica timeline, vectorized
+    change_ts = np.array([c[0] for c in changes])
+    order = np.argsort(change_ts, kind="stable")
+    change_ts = change_ts[order]
+    ready_at = np.array([c[1] for c in changes])[order]
+    provisioned_at = np.array([c[2] for c in changes])[order]
+
+    idx = np.searchsorted(change_ts, ts, side="right") - 1
+    per_pod = demand / np.maximum(ready_at[idx], 1)
+    violated = (per_pod > slo_cpu) | (ready_at[idx] == 0)
+
+    # Replica-hours from the piecewise-constant provisioned count
+    bounds = np.append(np.clip(change_ts, ts[0], ts[-1]), ts[-1])
+    replica_hours = float(np.sum(provisioned_at * np.diff(bounds)) / 3600)
+    cost_per_replica = engine.cost_profiles[profile]["cost_per_replica_per_hour"]
+
+    sample_seconds = np.diff(ts, append=ts[-1])
+    return {
+        "samples": int(len(ts)),
+        "duration_hours": round(float(ts[-1] - ts[0]) / 3600, 2),
+        "decisions": decisions,
+        "slo_violation_samples": int(violated.sum()),
+        "slo_violation_minutes": round(float(sample_seconds[violated].sum()) / 60, 1),
+        "slo_violation_percent": round(100 * float(violated.mean()), 3),
+        "replica_hours": round(replica_hours, 2),
+        "cost_usd": round(replica_hours * cost_per_replica, 4),
+        "scale_events": scale_ups + scale_downs,
+        "scale_ups": scale_ups,
+        "scale_downs": scale_downs,
+        "mean_replicas": round(float(provisioned_at[idx].mean()), 2),
+        "forecast_mae": engine.forecast_errors(),
+    }
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Replay a load series through the NimbusOps decision engine")
+    parser.add_argument("input", help="CSV, Parquet or Prometheus query_range JSON")
+    parser.add_argument("--interval", type=float, default=60, help="Seconds between decisions")
+    parser.add_argument("--startup-delay", type=float, default=90, help="Seconds before a new pod serves load")
+    parser.add_argument("--initial-replicas", type=int, default=3)
+    parser.add_argument("--recorded-replicas", type=int, default=1,
+                        help="Replicas behind the recorded cpu when the input has no replicas column")
+    parser.add_argument("--slo-cpu", type=float, default=0.9, help="Per-pod CPU above which a sample violates the SLO")
+    parser.add_argument("--profile", default="gcp_e2_medium", help="Key of CostAwareDecisionEngine.cost_profiles")
+    parser.add_argument("--policy", help="JSON file overriding fields of the default policy")
+    args = parser.parse_args(argv)
+
+    frame = load_series(args.input)
+    engine = CostAwareDecisionEngine()
+    if args.policy:
+        with open(args.policy) as f:
+            engine.policies["default"].update(json.load(f))
+
+    report = simulate(
+        frame,
+        engine,
+        interval=args.interval,
+        startup_delay=args.startup_delay,
+        initial_replicas=args.initial_replicas,
+        recorded_replicas=args.recorded_replicas,
+        slo_cpu=args.slo_cpu,
+        profile=args.profile,
+    )
+    json.dump(report, sys.stdout, indent=2)
+    print()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,168 @@
+import os
+import json
+import time
+import queue
+import sqlite3
+import threading
+from typing import List, Optional, Tuple
+
+from prometheus_client import Counter
+
+from history import RingHistory
+
+# SQLite file holding engine history and decisions; empty disables persistence
+STATE_DB_PATH = os.getenv("STATE_DB_PATH", "/var/lib/nimbusops/state.db")
+STATE_RETENTION_SECONDS = float(os.getenv("STATE_RETENTION_SECONDS", str(7 * 24 * 3600)))
+STATE_QUEUE_SIZE = int(os.getenv("STATE_QUEUE_SIZE", "10000"))
+
+STATE_WRITES_DROPPED = Counter(
+    'nimbusops_state_writes_dropped_total',
+    'State snapshot rows dropped because the writer queue was full'
+)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS samples (
+    namespace TEXT NOT NULL,
+    deployment TEXT NOT NULL,
+    timestamp REAL NOT NULL,
+    cpu REAL NOT NULL,
+    replicas INTEGER NOT NULL,
+    request_rate REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS samples_target_time ON samples (namespace, deployment, timestamp);
+CREATE TABLE IF NOT EXISTS decisions (
+    namespace TEXT NOT NULL,
+    deployment TEXT NOT NULL,
+    timestamp REAL NOT NULL,
+    entry TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS decisions_target_time ON decisions (namespace, deployment, timestamp);
+"""
+
+Key = Tuple[str, str]
+
+class StateStore:
+    """
+    Append-only SQLite (WAL) snapshot of per-target engine history and
+    decisions, so a restarted scaler resumes with a warm predictor.
+
+    The control loop only enqueues rows; a background thread writes them
+    in batches, so disk latency never lands on the decision path. When the
+    queue is full, rows are dropped and counted rather than blocking.
+    """
+
+    def __init__(self, path: str, retention_seconds: float = STATE_RETENTION_SECONDS):
+        self.path = path
+        self.retention_seconds = retention_seconds
+        self._queue: "queue.Queue" = queue.Queue(maxsize=STATE_QUEUE_SIZE)
+        self._lock = threading.Lock()
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(SCHEMA)
+
+        self._writer = threading.Thread(target=self._write_loop, daemon=True, name="state-writer")
+        self._writer.start()
+
+    # ---------------- Restore ----------------
+    def restore_history(self, key: Key, history: RingHistory):
+        """Append the newest persisted samples for a target into an (empty) ring buffer"""
+        with self._lock:
+            rows = self._conn.execute(
+                """
+                SELECT timestamp, cpu, replicas, request_rate FROM (
+                    SELECT * FROM samples WHERE namespace = ? AND deployment = ?
+                    ORDER BY timestamp DESC LIMIT ?
+                ) ORDER BY timestamp
+                """,
+                (*key, history.capacity)
+            ).fetchall()
+        for row in rows:
+            history.append(*row)
+        return len(rows)
+
+    def recent_decisions(self, key: Key, limit: int = 50) -> List[dict]:
+        with self._lock:
+            rows = self._conn.execute(
+                """
+                SELECT entry FROM (
+                    SELECT entry, timestamp FROM decisions WHERE namespace = ? AND deployment = ?
+                    ORDER BY timestamp DESC LIMIT ?
+                ) ORDER BY timestamp
+                """,
+                (*key, limit)
+            ).fetchall()
+        return [json.loads(entry) for (entry,) in rows]
+
+    # ---------------- Writes (non-blocking) ----------------
+    def record_sample(self, key: Key, timestamp: float, cpu: float, replicas: int, request_rate: float):
+        self._enqueue(("samples", (*key, float(timestamp), float(cpu), int(replicas), float(request_rate))))
+
+    def record_decision(self, key: Key, entry: dict):
+        self._enqueue(("decisions", (*key, time.time(), json.dumps(entry, default=str))))
+
+    def _enqueue(self, item):
+        try:
+            self._queue.put_nowait(item)
+        except queue.Full:
+            STATE_WRITES_DROPPED.inc()
+
+    def _write_loop(self):
+        last_prune = 0.0
+        while True:
+            batch = [self._queue.get()]
+            while True:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            if any(item is None for item in batch):
+                self._flush([item for item in batch if item is not None])
+                return
+
+            self._flush(batch)
+            if time.monotonic() - last_prune > 3600:
+                self._prune()
+                last_prune = time.monotonic()
+
+    def _flush(self, batch):
+        samples = [row for table, row in batch if table == "samples"]
+        decisions = [row for table, row in batch if table == "decisions"]
+        try:
+            with self._lock, self._conn:
+                if samples:
+                    self._conn.executemany("INSERT INTO samples VALUES (?, ?, ?, ?, ?, ?)", samples)
+                if decisions:
+                    self._conn.executemany("INSERT INTO decisions VALUES (?, ?, ?, ?)", decisions)
+        except sqlite3.Error as e:
+            print(f"[NimbusOps] State snapshot write failed: {e}")
+
+    def _prune(self):
+        cutoff = time.time() - self.retention_seconds
+        try:
+            with self._lock, self._conn:
+                self._conn.execute("DELETE FROM samples WHERE timestamp < ?", (cutoff,))
+                self._conn.execute("DELETE FROM decisions WHERE timestamp < ?", (cutoff,))
+        except sqlite3.Error as e:
+            print(f"[NimbusOps] State snapshot prune failed: {e}")
+
+    def close(self):
+        """Flush queued rows and stop the writer"""
+        self._queue.put(None)
+        self._writer.join(timeout=10)
+        with self._lock:
+            self._conn.close()
+
+def open_state_store() -> Optional[StateStore]:
+    if not STATE_DB_PATH:
+        return None
+    try:
+        return StateStore(STATE_DB_PATH)
+    except (OSError, sqlite3.Error) as e:
+        print(f"[NimbusOps] State persistence disabled, cannot open {STATE_DB_PATH}: {e}")
+        return None
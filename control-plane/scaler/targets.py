@@ -0,0 +1,82 @@
+import os
+from dataclasses import dataclass
+from typing import List, Optional
+
+from deployment_scaler import apps, custom
+
+# Discovery: an explicit label selector wins, then MLDeployment resources,
+# then the single TARGET_NAMESPACE/TARGET_DEPLOYMENT pair
+TARGET_NAMESPACE = os.getenv("TARGET_NAMESPACE", "aurora-system")
+TARGET_DEPLOYMENT = os.getenv("TARGET_DEPLOYMENT", "aurora-inference")
+TARGET_NAMESPACES = [ns for ns in os.getenv("TARGET_NAMESPACES", TARGET_NAMESPACE).split(",") if ns]
+TARGET_SELECTOR = os.getenv("TARGET_SELECTOR", "")
+DISCOVER_MLDEPLOYMENTS = os.getenv("DISCOVER_MLDEPLOYMENTS", "false").lower() == "true"
+
+# Deployments serving an MLDeployment carry its model name in this label
+MODEL_LABEL = "aurora.io/model"
+
+MLD_GROUP = "aurora.io"
+MLD_VERSION = "v1alpha1"
+MLD_PLURAL = "mldeployments"
+
+@dataclass(frozen=True)
+class Target:
+    namespace: str
+    deployment: str
+    replicas: Optional[int] = None
+    # p95 latency objective from the owning MLDeployment, if any
+    latency_slo_seconds: Optional[float] = None
+
+    @property
+    def key(self) -> tuple:
+        return (self.namespace, self.deployment)
+
+    def __str__(self) -> str:
+        return f"{self.namespace}/{self.deployment}"
+
+def _list_deployments(namespace: str, selector: str, latency_slo_seconds: Optional[float] = None) -> List[Target]:
+    deployments = apps().list_namespaced_deployment(namespace, label_selector=selector)
+    return [
+        Target(namespace, d.metadata.name, d.spec.replicas, latency_slo_seconds)
+        for d in deployments.items
+    ]
+
+def discover_by_selector(selector: str) -> List[Target]:
+    """Deployments matching a label selector in every watched namespace"""
+    targets = []
+    for namespace in TARGET_NAMESPACES:
+        targets.extend(_list_deployments(namespace, selector))
+    return targets
+
+def discover_mldeployments() -> List[Target]:
+    """Deployments labelled with the modelName of an MLDeployment in the same namespace"""
+    targets = []
+    for namespace in TARGET_NAMESPACES:
+        resources = custom().list_namespaced_custom_object(MLD_GROUP, MLD_VERSION, namespace, MLD_PLURAL)
+        # Several MLDeployments of one model share its deployments; the strictest SLO applies
+        slos = {}
+        for item in resources.get("items", []):
+            model = item["spec"]["modelName"]
+            latency_ms = (item["spec"].get("slo") or {}).get("latencyP95Ms")
+            slo = latency_ms / 1000 if latency_ms else None
+            if model not in slos or (slo is not None and (slos[model] is None or slo < slos[model])):
+                slos[model] = slo
+        for model in sorted(slos):
+            targets.extend(_list_deployments(namespace, f"{MODEL_LABEL}={model}", slos[model]))
+    return targets
+
+def discover_targets() -> List[Target]:
+    """Current scaling targets, de-duplicated; falls back to the static target. Raises on API errors"""
+    targets: List[Target] = []
+    if TARGET_SELECTOR:
+        targets = discover_by_selector(TARGET_SELECTOR)
+    elif DISCOVER_MLDEPLOYMENTS:
+        targets = discover_mldeployments()
+
+    if not targets:
+        return [Target(TARGET_NAMESPACE, TARGET_DEPLOYMENT)]
+
+    unique = {}
+    for target in targets:
+        unique.setdefault(target.key, target)
+    return list(unique.values())
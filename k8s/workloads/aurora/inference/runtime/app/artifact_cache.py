@@ -0,0 +1,143 @@
+import os
+import json
+import shutil
+import hashlib
+import logging
+import tempfile
+from pathlib import Path
+from typing import Callable, Optional, Tuple
+
+logger = logging.getLogger("aurora-inference")
+
+MANIFEST = "manifest.json"
+METADATA = "metadata.json"
+ARTIFACT_DIR = "model"
+
+
+def _sha256(path: Path) -> str:
+    digest = hashlib.sha256()
+    with path.open("rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _write_json_atomic(path: Path, data: dict):
+    tmp = path.with_suffix(f".{os.getpid()}.tmp")
+    tmp.write_text(json.dumps(data))
+    os.replace(tmp, path)
+
+
+class ArtifactCache:
+    """
+    Local (or shared-volume) cache of downloaded model artifacts.
+
+    Each entry lives under `<root>/<model>/<version>-<run_id>/` with a
+    manifest of SHA-256 checksums that is verified before the entry is
+    reused. Entries are staged in a temp directory and renamed into place,
+    so pods sharing one volume never observe a half-written download.
+    """
+
+    def __init__(self, root: Path):
+        self.root = Path(root)
+
+    def entry_dir(self, name: str, version: str, run_id: str) -> Path:
+        return self.root / name / f"{version}-{run_id}"
+
+    def get(self, name: str, version: str, run_id: str) -> Optional[Path]:
+        """Return the verified artifact directory for this version, or None on a miss"""
+        entry = self.entry_dir(name, version, run_id)
+        manifest_path = entry / MANIFEST
+        if not manifest_path.exists():
+            return None
+
+        try:
+            manifest = json.loads(manifest_path.read_text())
+            for rel_path, checksum in manifest["files"].items():
+                if _sha256(entry / ARTIFACT_DIR / rel_path) != checksum:
+                    raise ValueError(f"checksum mismatch for {rel_path}")
+        except (OSError, ValueError, KeyError) as e:
+            logger.warning(f"Discarding corrupt cache entry {entry}: {e}")
+            shutil.rmtree(entry, ignore_errors=True)
+            return None
+
+        return entry / ARTIFACT_DIR
+
+    def put(
+        self,
+        name: str,
+        version: str,
+        run_id: str,
+        download: Callable[[str], None],
+        metadata: Optional[dict] = None,
+    ) -> Path:
+        """Download into a staging directory, checksum it and publish it atomically"""
+        entry = self.entry_dir(name, version, run_id)
+        entry.parent.mkdir(parents=True, exist_ok=True)
+
+        staging = Path(tempfile.mkdtemp(prefix=f".{version}-", dir=entry.parent))
+        try:
+            artifact_dir = staging / ARTIFACT_DIR
+            artifact_dir.mkdir()
+            download(str(artifact_dir))
+
+            files = {
+                str(path.relative_to(artifact_dir)): _sha256(path)
+                for path in sorted(artifact_dir.rglob("*"))
+                if path.is_file()
+            }
+            if metadata is not None:
+                (staging / METADATA).write_text(json.dumps(metadata, default=str))
+            # Manifest last: its presence marks the entry as complete
+            (staging / MANIFEST).write_text(json.dumps({"files": files}))
+
+            try:
+                os.rename(staging, entry)
+            except OSError:
+                # Another pod on the shared volume published the same version first
+                if self.get(name, version, run_id) is None:
+                    os.rename(staging, entry)
+        finally:
+            shutil.rmtree(staging, ignore_errors=True)
+
+        return entry / ARTIFACT_DIR
+
+    def derived(self, name: str, version: str, run_id: str, kind: str, build: Callable[[str], None]) -> Path:
+        """Return a representation derived from a cached artifact, building it on first use"""
+        target = self.entry_dir(name, version, run_id) / kind
+        if target.exists():
+            return target
+
+        staging = Path(tempfile.mkdtemp(prefix=f".{kind}-", dir=target.parent))
+        try:
+            build(str(staging))
+            try:
+                os.rename(staging, target)
+            except OSError:
+                # Built concurrently by another worker; theirs is equivalent
+                if not target.exists():
+                    raise
+        finally:
+            shutil.rmtree(staging, ignore_errors=True)
+
+        return target
+
+    def metadata(self, name: str, version: str, run_id: str) -> Optional[dict]:
+        try:
+            return json.loads((self.entry_dir(name, version, run_id) / METADATA).read_text())
+        except (OSError, ValueError):
+            return None
+
+    # ---------------- Alias pointers ----------------
+    def remember_alias(self, name: str, alias: str, version: str, run_id: str):
+        """Record what an alias resolved to so the next start can load without the registry"""
+        path = self.root / name / "aliases" / f"{alias}.json"
+        path.parent.mkdir(parents=True, exist_ok=True)
+        _write_json_atomic(path, {"version": version, "run_id": run_id})
+
+    def resolve_alias(self, name: str, alias: str) -> Optional[Tuple[str, str]]:
+        try:
+            pointer = json.loads((self.root / name / "aliases" / f"{alias}.json").read_text())
+            return pointer["version"], pointer["run_id"]
+        except (OSError, ValueError, KeyError):
+            return None
@@ -0,0 +1,144 @@
+import time
+import queue
+import logging
+import threading
+from concurrent.futures import Future
+from typing import Any, Callable, List
+
+import numpy as np
+
+logger = logging.getLogger("aurora-inference")
+
+
+class _PendingRequest:
+    __slots__ = ("rows", "model", "future", "enqueued_at")
+
+    def __init__(self, rows: np.ndarray, model: Any):
+        self.rows = rows
+        self.model = model
+        self.future = Future()
+        self.enqueued_at = time.perf_counter()
+
+
+class MicroBatcher:
+    """
+    Gathers concurrent prediction requests into a single matrix and runs
+    one vectorized predict call for the whole batch.
+
+    A batch is flushed once it holds `max_batch_size` rows or the oldest
+    request has waited `max_wait_ms`, whichever comes first.
+
+    Each request carries the model it was admitted against, and only
+    requests for the same model share a predict call, so a model swap
+    never computes a request with a model other than the one it captured.
+    """
+
+    def __init__(
+        self,
+        predict_fn: Callable[[Any, np.ndarray], np.ndarray],
+        max_batch_size: int = 64,
+        max_wait_ms: float = 2.0,
+        batch_size_histogram=None,
+        queue_wait_histogram=None,
+    ):
+        self.predict_fn = predict_fn
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000.0
+        self.batch_size_histogram = batch_size_histogram
+        self.queue_wait_histogram = queue_wait_histogram
+
+        self._queue: "queue.Queue[_PendingRequest]" = queue.Queue()
+        self._carry: List[_PendingRequest] = []
+        self._running = False
+        self._thread = None
+
+    def start(self):
+        if self._running:
+            return
+        self._running = True
+        self._thread = threading.Thread(target=self._run, name="micro-batcher", daemon=True)
+        self._thread.start()
+        logger.info(f"Micro-batcher started (max_batch_size={self.max_batch_size}, max_wait_ms={self.max_wait * 1000:.1f})")
+
+    def stop(self):
+        self._running = False
+        if self._thread is not None:
+            self._thread.join(timeout=1)
+
+    def submit(self, rows: np.ndarray, model: Any) -> Future:
+        """Queue rows for prediction by `model`; the future resolves to this caller's predictions"""
+        pending = _PendingRequest(rows, model)
+        self._queue.put(pending)
+        return pending.future
+
+    def predict(self, rows: np.ndarray, model: Any) -> np.ndarray:
+        """Blocking helper for sync callers"""
+        return self.submit(rows, model).result()
+
+    # ---------------- Worker ----------------
+    def _collect(self) -> List[_PendingRequest]:
+        if self._carry:
+            batch, self._carry = self._carry, []
+        else:
+            try:
+                batch = [self._queue.get(timeout=0.1)]
+            except queue.Empty:
+                return []
+
+        n_rows = sum(len(p.rows) for p in batch)
+        deadline = batch[0].enqueued_at + self.max_wait
+
+        while n_rows < self.max_batch_size:
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                break
+            try:
+                pending = self._queue.get(timeout=remaining)
+            except queue.Empty:
+                break
+            # Never split a request; an oversized one starts the next batch
+            if n_rows + len(pending.rows) > self.max_batch_size:
+                self._carry.append(pending)
+                break
+            batch.append(pending)
+            n_rows += len(pending.rows)
+
+        return batch
+
+    def _run(self):
+        while self._running:
+            batch = self._collect()
+            if not batch:
+                continue
+
+            now = time.perf_counter()
+            if self.queue_wait_histogram is not None:
+                for pending in batch:
+                    self.queue_wait_histogram.observe(now - pending.enqueued_at)
+
+            # Requests for another model (mid-swap) or with a different feature count cannot share a matrix
+            groups = {}
+            for pending in batch:
+                groups.setdefault((id(pending.model), pending.rows.shape[1]), []).append(pending)
+
+            for group in groups.values():
+                self._execute(group)
+
+    def _execute(self, group: List[_PendingRequest]):
+        matrix = group[0].rows if len(group) == 1 else np.vstack([p.rows for p in group])
+
+        if self.batch_size_histogram is not None:
+            self.batch_size_histogram.observe(len(matrix))
+
+        try:
+            predictions = np.asarray(self.predict_fn(group[0].model, matrix))
+        except Exception as e:
+            for pending in group:
+                pending.future.set_exception(e)
+            return
+
+        offset = 0
+        for pending in group:
+            n = len(pending.rows)
+            pending.future.set_result(predictions[offset:offset + n])
+            offset += n
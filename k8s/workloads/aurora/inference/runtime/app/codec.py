@@ -0,0 +1,50 @@
+from typing import Dict, Tuple
+
+import numpy as np
+
+# Raw little-endian tensor payloads: the body is the C-ordered array bytes,
+# shape and dtype travel in headers so the body maps straight into an ndarray.
+TENSOR_CONTENT_TYPE = "application/x-aurora-tensor"
+SHAPE_HEADER = "x-tensor-shape"
+DTYPE_HEADER = "x-tensor-dtype"
+
+DTYPES = {
+    "float32": np.dtype("<f4"),
+    "float64": np.dtype("<f8"),
+}
+
+
+class TensorDecodeError(ValueError):
+    """Raised when a binary payload does not match its declared shape or dtype"""
+
+
+def is_tensor(content_type: str) -> bool:
+    return (content_type or "").split(";")[0].strip().lower() == TENSOR_CONTENT_TYPE
+
+
+def decode_tensor(body: bytes, shape: str, dtype: str = "float32") -> np.ndarray:
+    """Map a raw request body onto a read-only 2D ndarray without copying"""
+    if dtype not in DTYPES:
+        raise TensorDecodeError(f"Unsupported {DTYPE_HEADER} '{dtype}', expected one of {sorted(DTYPES)}")
+
+    try:
+        rows, cols = (int(dim) for dim in shape.split(","))
+    except (AttributeError, ValueError):
+        raise TensorDecodeError(f"{SHAPE_HEADER} must be '<rows>,<cols>'")
+
+    if rows <= 0 or cols <= 0:
+        raise TensorDecodeError(f"{SHAPE_HEADER} dimensions must be positive")
+
+    np_dtype = DTYPES[dtype]
+    expected = rows * cols * np_dtype.itemsize
+    if len(body) != expected:
+        raise TensorDecodeError(f"Body is {len(body)} bytes, shape {rows}x{cols} {dtype} needs {expected}")
+
+    return np.frombuffer(body, dtype=np_dtype).reshape(rows, cols)
+
+
+def encode_tensor(array: np.ndarray) -> Tuple[bytes, Dict[str, str]]:
+    """Serialize predictions as raw little-endian float64 plus the matching headers"""
+    array = np.ascontiguousarray(array, dtype=DTYPES["float64"])
+    shape = ",".join(str(dim) for dim in array.shape)
+    return array.tobytes(), {SHAPE_HEADER: shape, DTYPE_HEADER: "float64"}
@@ -0,0 +1,147 @@
+import os
+import math
+import asyncio
+import logging
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor, ProcessPoolExecutor
+from contextlib import contextmanager
+from typing import Callable
+
+logger = logging.getLogger("aurora-inference")
+
+
+class QueueFullError(Exception):
+    """Raised when the inference queue is too deep to accept more work"""
+
+
+def _read(path: str) -> str:
+    with open(path) as f:
+        return f.read().strip()
+
+
+def cpu_limit() -> int:
+    """Number of CPUs granted to this container by its cgroup, falling back to the host count"""
+    try:
+        # cgroup v2: "<quota> <period>" or "max <period>"
+        quota, period = _read("/sys/fs/cgroup/cpu.max").split()
+        if quota != "max":
+            return max(1, math.ceil(int(quota) / int(period)))
+    except (OSError, ValueError):
+        pass
+
+    try:
+        # cgroup v1
+        quota = int(_read("/sys/fs/cgroup/cpu/cpu.cfs_quota_us"))
+        period = int(_read("/sys/fs/cgroup/cpu/cpu.cfs_period_us"))
+        if quota > 0 and period > 0:
+            return max(1, math.ceil(quota / period))
+    except (OSError, ValueError):
+        pass
+
+    return os.cpu_count() or 1
+
+
+# ---------------- Process workers ----------------
+_worker_model = None
+
+
+def _init_process_worker(model):
+    global _worker_model
+    _worker_model = model
+
+
+def _process_predict(rows):
+    return _worker_model.predict(rows)
+
+
+class InferencePool:
+    """
+    Dedicated, bounded pool for CPU-heavy predict calls.
+
+    Keeps model execution off the event loop and the default threadpool,
+    and rejects new work once more than `max_queue_depth` requests are
+    waiting for a worker.
+    """
+
+    def __init__(
+        self,
+        workers: int,
+        max_queue_depth: int,
+        kind: str = "thread",
+        inflight_gauge=None,
+        queued_gauge=None,
+    ):
+        if kind not in ("thread", "process"):
+            raise ValueError(f"Unknown pool kind: {kind}")
+
+        self.workers = workers
+        self.max_queue_depth = max_queue_depth
+        self.kind = kind
+        self.inflight_gauge = inflight_gauge
+        self.queued_gauge = queued_gauge
+
+        self._lock = threading.Lock()
+        self._inflight = 0
+        self._executor = None
+        self.model = None  # the model process workers were started with
+        if kind == "thread":
+            self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="inference")
+
+        logger.info(f"Inference pool ready ({kind}, workers={workers}, max_queue_depth={max_queue_depth})")
+
+    @property
+    def inflight(self) -> int:
+        return self._inflight
+
+    @property
+    def queued(self) -> int:
+        return max(0, self._inflight - self.workers)
+
+    def set_model(self, model):
+        """Process workers hold their own model copy, so rebuild them when the model changes"""
+        if self.kind != "process":
+            return
+
+        old = self._executor
+        self.model = model
+        self._executor = ProcessPoolExecutor(
+            max_workers=self.workers,
+            initializer=_init_process_worker,
+            initargs=(model,),
+        )
+        if old is not None:
+            old.shutdown(wait=False)
+
+    @contextmanager
+    def admit(self):
+        """Reserve a slot for one request or raise QueueFullError immediately"""
+        with self._lock:
+            if self._inflight - self.workers >= self.max_queue_depth:
+                raise QueueFullError(f"{self.queued} requests already queued")
+            self._inflight += 1
+            self._publish()
+        try:
+            yield
+        finally:
+            with self._lock:
+                self._inflight -= 1
+                self._publish()
+
+    def submit(self, fn: Callable, *args) -> Future:
+        if self.kind == "process":
+            # Only the model's predict can cross the process boundary
+            return self._executor.submit(_process_predict, *args)
+        return self._executor.submit(fn, *args)
+
+    async def run(self, fn: Callable, *args):
+        return await asyncio.wrap_future(self.submit(fn, *args))
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+
+    def _publish(self):
+        if self.inflight_gauge is not None:
+            self.inflight_gauge.set(self._inflight)
+        if self.queued_gauge is not None:
+            self.queued_gauge.set(self.queued)
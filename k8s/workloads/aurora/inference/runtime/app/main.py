@@ -1,13 +1,32 @@
 import os
 import time
+import asyncio
 import logging
+import threading
 import mlflow
 import mlflow.sklearn
+import numpy as np
+from contextlib import nullcontext
+from dataclasses import dataclass, field
 from pathlib import Path
-from fastapi import FastAPI, HTTPException, Depends
-from pydantic import BaseModel
+from typing import Any, Optional
+from fastapi import FastAPI, HTTPException, Depends, Request, Response
+from fastapi.exceptions import RequestValidationError
+from pydantic import BaseModel, ValidationError
 from prometheus_client import Counter, Histogram, Gauge, generate_latest
-from starlette.responses import Response
+from starlette.concurrency import run_in_threadpool
+
+from app.artifact_cache import ArtifactCache
+from app.batching import MicroBatcher
+from app.codec import (
+    TENSOR_CONTENT_TYPE, SHAPE_HEADER, DTYPE_HEADER,
+    TensorDecodeError, decode_tensor, encode_tensor, is_tensor,
+)
+from app.executor import InferencePool, QueueFullError, cpu_limit
+from app.prediction_cache import PredictionCache
+from app.scaler_notify import ScalerNotifier
+from app.predictors import compile_model, select_predictor
+from app.tree_arrays import FlatTreeEnsemble
 
 # ---------------- Logging ----------------
 logging.basicConfig(level=logging.INFO)
@@ -18,7 +37,44 @@ API_KEY = os.getenv("API_KEY", "aurora-internal-key")
 MLFLOW_TRACKING_URI = os.getenv("MLFLOW_TRACKING_URI", "http://mlflow-server.aurora-system.svc.cluster.local:5000")
 MODEL_NAME = os.getenv("MODEL_NAME", "california-housing")
 MODEL_ALIAS = os.getenv("MODEL_ALIAS", "stable")
-CACHE_DIR = Path("/tmp/model-cache")
+CACHE_DIR = Path(os.getenv("MODEL_CACHE_DIR", "/tmp/model-cache"))
+
+# "pickle" unpickles a private copy per worker; "mmap" serves tree ensembles from
+# flattened arrays memory-mapped out of the cache, shared by all workers on the node
+MODEL_FORMAT = os.getenv("MODEL_FORMAT", "pickle").lower()
+
+# "sklearn" or "compiled" (flat-array tree traversal); a model can override it
+# with a `predictor_backend` run param logged at training time
+PREDICTOR_BACKEND = os.getenv("PREDICTOR_BACKEND", "sklearn").lower()
+COMPILED_CROSSOVER_ROWS = int(os.getenv("COMPILED_CROSSOVER_ROWS", "256"))
+
+# Startup retries MLflow with exponential backoff until a model is ready
+LOAD_RETRY_INITIAL_SECONDS = float(os.getenv("LOAD_RETRY_INITIAL_SECONDS", "1"))
+LOAD_RETRY_MAX_SECONDS = float(os.getenv("LOAD_RETRY_MAX_SECONDS", "30"))
+
+# Micro-batching (opt-in)
+BATCHING_ENABLED = os.getenv("BATCHING_ENABLED", "false").lower() == "true"
+MAX_BATCH_SIZE = int(os.getenv("MAX_BATCH_SIZE", "64"))
+MAX_BATCH_WAIT_MS = float(os.getenv("MAX_BATCH_WAIT_MS", "2"))
+
+# Serving mode: "sync" runs predict on the default threadpool, "async" uses a dedicated bounded pool
+SERVING_MODE = os.getenv("SERVING_MODE", "sync").lower()
+INFERENCE_POOL = os.getenv("INFERENCE_POOL", "thread").lower()  # "thread" or "process"
+INFERENCE_WORKERS = int(os.getenv("INFERENCE_WORKERS", "0")) or cpu_limit()
+MAX_QUEUE_DEPTH = int(os.getenv("MAX_QUEUE_DEPTH", "32"))
+
+# Prediction cache (opt-in)
+PREDICTION_CACHE_ENABLED = os.getenv("PREDICTION_CACHE_ENABLED", "false").lower() == "true"
+PREDICTION_CACHE_MAX_ENTRIES = int(os.getenv("PREDICTION_CACHE_MAX_ENTRIES", "100000"))
+PREDICTION_CACHE_TTL_SECONDS = float(os.getenv("PREDICTION_CACHE_TTL_SECONDS", "300"))
+
+# Wake the scaler's control loop when the inference queue backs up; empty URL disables
+SCALER_WAKEUP_URL = os.getenv("SCALER_WAKEUP_URL", "")
+SCALER_WAKEUP_QUEUE_DEPTH = int(os.getenv("SCALER_WAKEUP_QUEUE_DEPTH", "16"))
+SCALER_WAKEUP_COOLDOWN_SECONDS = float(os.getenv("SCALER_WAKEUP_COOLDOWN_SECONDS", "5"))
+
+# Synthetic batch sizes run against a freshly loaded model before it takes traffic
+WARMUP_BATCH_SIZES = (1, 8, 64)
 
 # Configure MLflow for RGW
 os.environ['MLFLOW_S3_ENDPOINT_URL'] = os.getenv('MLFLOW_S3_ENDPOINT_URL', 'http://rook-ceph-rgw-mlflow-store.rook-ceph.svc.cluster.local:80')
@@ -54,19 +110,118 @@ REQUEST_LATENCY = Histogram(
     ["model_version"]
 )
 
+BATCH_SIZE = Histogram(
+    "aurora_inference_batch_size",
+    "Rows per vectorized predict call issued by the micro-batcher",
+    buckets=(1, 2, 4, 8, 16, 32, 64, 128, 256, 512, 1024)
+)
+
+BATCH_QUEUE_WAIT = Histogram(
+    "aurora_inference_batch_queue_wait_seconds",
+    "Time a request waits in the micro-batcher queue",
+    buckets=(0.0001, 0.00025, 0.0005, 0.001, 0.002, 0.005, 0.01, 0.025, 0.05, 0.1)
+)
+
+INFLIGHT_REQUESTS = Gauge(
+    "aurora_inference_inflight_requests",
+    "Admitted prediction requests not yet completed (queued + executing)"
+)
+
+QUEUED_REQUESTS = Gauge(
+    "aurora_inference_queued_requests",
+    "Admitted prediction requests waiting for an inference worker"
+)
+
+CACHE_HITS = Counter(
+    "aurora_inference_cache_hits_total",
+    "Input rows served from the prediction cache"
+)
+
+CACHE_MISSES = Counter(
+    "aurora_inference_cache_misses_total",
+    "Input rows not found in the prediction cache"
+)
+
+CACHE_EVICTIONS = Counter(
+    "aurora_inference_cache_evictions_total",
+    "Prediction cache entries evicted",
+    ["reason"]
+)
+
 MODEL_LOADED = Gauge(
     "aurora_inference_model_loaded",
     "Model loaded status (1=loaded, 0=not loaded)"
 )
 
-model = None
-model_version = None
-model_metadata = {}
+MODEL_LOAD_DURATION = Histogram(
+    "aurora_inference_model_load_duration_seconds",
+    "Time to fetch and warm up a model before it is swapped in",
+    buckets=(0.5, 1, 2.5, 5, 10, 20, 30, 60, 120, 300)
+)
+
+TIME_TO_READY = Gauge(
+    "aurora_inference_time_to_ready_seconds",
+    "Seconds from process start until the first model was ready to serve"
+)
+
+MODEL_SWAPS = Counter(
+    "aurora_inference_model_swaps_total",
+    "Number of times a newly loaded model replaced the serving model"
+)
+
+# ---------------- Model State ----------------
+@dataclass(frozen=True)
+class ServingModel:
+    """Model, version and metadata published together through a single reference swap"""
+    model: Any
+    version: str
+    metadata: dict = field(default_factory=dict)
+
+serving: Optional[ServingModel] = None
+reload_lock = threading.Lock()
+artifact_cache = ArtifactCache(CACHE_DIR)
+
+def process_start_time() -> float:
+    """Wall-clock start of this process from /proc, so interpreter and import time are included"""
+    try:
+        with open("/proc/self/stat") as f:
+            start_ticks = int(f.read().rsplit(")", 1)[1].split()[19])
+        with open("/proc/stat") as f:
+            boot_time = next(int(line.split()[1]) for line in f if line.startswith("btime"))
+        return boot_time + start_ticks / os.sysconf("SC_CLK_TCK")
+    except (OSError, ValueError, IndexError, StopIteration):
+        return time.time()
+
+PROCESS_START = process_start_time()
+
+batcher = None
+pool = None
+scaler_notifier = ScalerNotifier(SCALER_WAKEUP_URL, SCALER_WAKEUP_COOLDOWN_SECONDS) if SCALER_WAKEUP_URL else None
+prediction_cache = None
+if PREDICTION_CACHE_ENABLED:
+    prediction_cache = PredictionCache(
+        max_entries=PREDICTION_CACHE_MAX_ENTRIES,
+        ttl_seconds=PREDICTION_CACHE_TTL_SECONDS,
+        hit_counter=CACHE_HITS,
+        miss_counter=CACHE_MISSES,
+        eviction_counter=CACHE_EVICTIONS,
+    )
 
 # ---------------- Schemas ----------------
 class PredictionRequest(BaseModel):
     inputs: list[list[float]]
 
+PREDICT_REQUEST_BODY = {
+    "required": True,
+    "content": {
+        "application/json": {"schema": PredictionRequest.model_json_schema()},
+        TENSOR_CONTENT_TYPE: {
+            "schema": {"type": "string", "format": "binary"},
+            "description": f"Raw little-endian rows, shape in '{SHAPE_HEADER}: <rows>,<cols>', dtype in '{DTYPE_HEADER}' (float32/float64)",
+        },
+    },
+}
+
 # ---------------- Security ----------------
 def verify_api_key(api_key: str = None):
     if API_KEY and api_key != API_KEY:
@@ -74,106 +229,335 @@ def verify_api_key(api_key: str = None):
     return api_key
 
 # ---------------- Model Loading ----------------
-def load_model():
-    global model, model_version, model_metadata
+def resolve_version(offline: bool = False):
+    """Resolve MODEL_ALIAS to (version, run_id); offline uses the pointer saved by the last online resolve"""
+    if offline:
+        pointer = artifact_cache.resolve_alias(MODEL_NAME, MODEL_ALIAS)
+        if pointer is None:
+            raise Exception(f"No cached alias pointer for {MODEL_NAME}@{MODEL_ALIAS}")
+        logger.info(f"Using cached alias pointer: {MODEL_NAME}@{MODEL_ALIAS} -> v{pointer[0]}")
+        return pointer
+
+    logger.info(f"Resolving model {MODEL_NAME} with alias '{MODEL_ALIAS}' from MLflow")
+    logger.info(f"MLflow Tracking URI: {MLFLOW_TRACKING_URI}")
+
+    # Get model version from alias
+    client = mlflow.tracking.MlflowClient()
 
+    # First, check if the model exists
     try:
-        logger.info(f"Loading model {MODEL_NAME} with alias '{MODEL_ALIAS}' from MLflow")
-        logger.info(f"MLflow Tracking URI: {MLFLOW_TRACKING_URI}")
+        model_version_info = client.get_model_version_by_alias(MODEL_NAME, MODEL_ALIAS)
+        version = model_version_info.version
+        run_id = model_version_info.run_id
+        logger.info(f"Found model version: {version}, Run ID: {run_id}")
+    except Exception as e:
+        logger.error(f"Could not find model {MODEL_NAME} with alias {MODEL_ALIAS}: {e}")
+        # Try to get latest version as fallback
+        latest_versions = client.get_latest_versions(MODEL_NAME, stages=["None"])
+        if not latest_versions:
+            raise Exception("No versions found")
+        version = latest_versions[0].version
+        run_id = latest_versions[0].run_id
+        logger.info(f"Using latest version as fallback: {version}")
 
-        # Create cache directory
-        CACHE_DIR.mkdir(parents=True, exist_ok=True)
+    return version, run_id
 
-        # Get model version from alias
-        client = mlflow.tracking.MlflowClient()
-        
-        # First, check if the model exists
-        try:
-            model_version_info = client.get_model_version_by_alias(MODEL_NAME, MODEL_ALIAS)
-            model_version = model_version_info.version
-            run_id = model_version_info.run_id
-            logger.info(f"Found model version: {model_version}, Run ID: {run_id}")
-        except Exception as e:
-            logger.error(f"Could not find model {MODEL_NAME} with alias {MODEL_ALIAS}: {e}")
-            # Try to get latest version as fallback
-            try:
-                latest_versions = client.get_latest_versions(MODEL_NAME, stages=["None"])
-                if latest_versions:
-                    model_version = latest_versions[0].version
-                    run_id = latest_versions[0].run_id
-                    logger.info(f"Using latest version as fallback: {model_version}")
-                else:
-                    raise Exception("No versions found")
-            except Exception as e2:
-                logger.error(f"Could not find any versions: {e2}")
-                MODEL_LOADED.set(0)
-                return
+def fetch_model(version: str, run_id: str) -> ServingModel:
+    """Load a model version from the local artifact cache, downloading it from MLflow on a miss"""
+    local_path = artifact_cache.get(MODEL_NAME, version, run_id)
 
-        # Load model from MLflow
-        model_uri = f"models:/{MODEL_NAME}/{model_version}"
-        logger.info(f"Loading model from {model_uri}")
-        model = mlflow.sklearn.load_model(model_uri)
+    if local_path is None:
+        model_uri = f"models:/{MODEL_NAME}/{version}"
+        logger.info(f"Cache miss, downloading model from {model_uri}")
 
         # Get metadata
-        run = client.get_run(run_id)
-        model_metadata = {
+        run = mlflow.tracking.MlflowClient().get_run(run_id)
+        metadata = {
             "model_name": MODEL_NAME,
-            "version": model_version,
-            "alias": MODEL_ALIAS,
+            "version": version,
             "run_id": run_id,
             "metrics": run.data.metrics,
             "params": run.data.params,
-            "timestamp": time.time()
         }
+        local_path = artifact_cache.put(
+            MODEL_NAME, version, run_id,
+            download=lambda dst: mlflow.artifacts.download_artifacts(artifact_uri=model_uri, dst_path=dst),
+            metadata=metadata,
+        )
+    else:
+        logger.info(f"Loading model v{version} from cache {local_path}")
+
+    loaded = load_artifact(local_path, version, run_id)
+    metadata = artifact_cache.metadata(MODEL_NAME, version, run_id) or {"version": version, "run_id": run_id}
+
+    backend = metadata.get("params", {}).get("predictor_backend", PREDICTOR_BACKEND).lower()
+    loaded = select_predictor(loaded, backend, crossover_rows=COMPILED_CROSSOVER_ROWS, version=version)
+    metadata.update({"alias": MODEL_ALIAS, "predictor_backend": type(loaded).__name__, "timestamp": time.time()})
+
+    return ServingModel(model=loaded, version=version, metadata=metadata)
+
+def load_artifact(local_path: Path, version: str, run_id: str):
+    """Deserialize a cached artifact in the configured MODEL_FORMAT"""
+    if MODEL_FORMAT == "mmap":
+        def flatten(dst: str):
+            compile_model(mlflow.sklearn.load_model(str(local_path))).save(dst)
+
+        try:
+            flat_dir = artifact_cache.derived(MODEL_NAME, version, run_id, "flat", build=flatten)
+            logger.info(f"Memory-mapping flattened model v{version} from {flat_dir}")
+            return FlatTreeEnsemble.load(flat_dir, mmap=True)
+        except ValueError as e:
+            logger.warning(f"Model v{version} can't be memory-mapped ({e}), falling back to pickle")
+
+    return mlflow.sklearn.load_model(str(local_path))
+
+def warm_up(candidate: ServingModel):
+    """Run a few synthetic predictions so first real requests don't pay for lazy initialisation"""
+    n_features = getattr(candidate.model, "n_features_in_", None)
+    if not n_features:
+        logger.warning(f"Skipping warm-up for v{candidate.version}: unknown feature count")
+        return
+
+    for batch_size in WARMUP_BATCH_SIZES:
+        candidate.model.predict(np.zeros((batch_size, n_features)))
+
+def install_model(candidate: ServingModel):
+    """Publish a loaded model to request handlers in one atomic reference swap"""
+    global serving
+
+    if pool is not None:
+        pool.set_model(candidate.model)
+
+    previous = serving
+    serving = candidate
+
+    if prediction_cache is not None:
+        prediction_cache.clear()
+
+    MODEL_LOADED.set(1)
+    if previous is not None:
+        MODEL_SWAPS.inc()
+    else:
+        TIME_TO_READY.set(time.time() - PROCESS_START)
+
+def load_model(offline: bool = False) -> bool:
+    """Fetch, warm up and swap in the model; the current model keeps serving until the swap"""
+    start_time = time.perf_counter()
+
+    try:
+        version, run_id = resolve_version(offline)
 
-        MODEL_LOADED.set(1)
-        logger.info(f"✅ Model loaded successfully: {MODEL_NAME} v{model_version} ({MODEL_ALIAS})")
+        current = serving
+        if current is not None and (current.version, current.metadata.get("run_id")) == (version, run_id):
+            logger.info(f"Already serving {MODEL_NAME} v{version}, nothing to reload")
+            return True
+
+        candidate = fetch_model(version, run_id)
+        warm_up(candidate)
+        MODEL_LOAD_DURATION.observe(time.perf_counter() - start_time)
+
+        install_model(candidate)
+        if not offline:
+            artifact_cache.remember_alias(MODEL_NAME, MODEL_ALIAS, version, run_id)
+        logger.info(f"✅ Model loaded successfully: {MODEL_NAME} v{candidate.version} ({MODEL_ALIAS})")
+        return True
 
     except Exception as e:
         logger.error(f"❌ Failed to load model: {e}")
-        MODEL_LOADED.set(0)
-        # Don't raise, just log - allow pod to start but show degraded status
+        # Don't raise, just log - keep serving the previous model or show degraded status
+        MODEL_LOADED.set(1 if serving is not None else 0)
+        return False
+
+def reload_in_background() -> bool:
+    """Start a background reload; returns False if one is already running"""
+    if not reload_lock.acquire(blocking=False):
+        return False
+
+    def run():
+        try:
+            load_model()
+        finally:
+            reload_lock.release()
+
+    threading.Thread(target=run, name="model-reload", daemon=True).start()
+    return True
+
+def load_until_ready():
+    """Startup loader: serve the cached model at once if there is one, then reconcile with MLflow"""
+    with reload_lock:
+        if artifact_cache.resolve_alias(MODEL_NAME, MODEL_ALIAS) is not None:
+            load_model(offline=True)
+
+        delay = LOAD_RETRY_INITIAL_SECONDS
+        while not load_model():
+            if serving is not None:
+                # The cached model is serving; a later /reload picks up alias changes
+                return
+            logger.info(f"Model not ready, retrying in {delay:.0f}s")
+            time.sleep(delay)
+            delay = min(delay * 2, LOAD_RETRY_MAX_SECONDS)
+
+# ---------------- Inference ----------------
+def run_batch(state: ServingModel, rows: np.ndarray) -> np.ndarray:
+    """Batcher entry point; hands the batch to process workers when they hold this request's model"""
+    if pool is not None and pool.kind == "process" and pool.model is state.model:
+        return pool.submit(state.model.predict, rows).result()
+    # Workers were already rebuilt for a newer model: keep the version the request captured
+    return state.model.predict(rows)
+
+async def parse_inputs(request: Request) -> np.ndarray:
+    """Decode the request body into a 2D float matrix (JSON by default, raw tensor on request)"""
+    body = await request.body()
+
+    if is_tensor(request.headers.get("content-type")):
+        try:
+            return decode_tensor(
+                body,
+                request.headers.get(SHAPE_HEADER),
+                request.headers.get(DTYPE_HEADER, "float32"),
+            )
+        except TensorDecodeError as e:
+            raise HTTPException(status_code=422, detail=str(e))
+
+    try:
+        inputs = PredictionRequest.model_validate_json(body).inputs
+        rows = np.asarray(inputs, dtype=np.float64)
+    except ValidationError as e:
+        # Same 422 body as a declared request model: locations are rooted at "body"
+        raise RequestValidationError(
+            [{**error, "loc": ("body", *error["loc"])} for error in e.errors(include_url=False)]
+        )
+    except ValueError:
+        raise HTTPException(status_code=422, detail="inputs rows must all have the same length")
+
+    if rows.ndim != 2 or rows.shape[0] == 0 or rows.shape[1] == 0:
+        raise HTTPException(status_code=422, detail="inputs must be a non-empty 2D array")
+    return rows
+
+async def infer(rows: np.ndarray, state: ServingModel) -> np.ndarray:
+    if batcher is not None:
+        return await asyncio.wrap_future(batcher.submit(rows, state))
+    if pool is not None and (pool.kind == "thread" or pool.model is state.model):
+        return await pool.run(state.model.predict, rows)
+    # No pool, or process workers already rebuilt for a newer model: keep the version the request captured
+    return await run_in_threadpool(state.model.predict, rows)
+
+async def infer_admitted(rows: np.ndarray, state: ServingModel) -> np.ndarray:
+    """Run inference under an inference-pool slot; raises QueueFullError when the queue is full"""
+    admission = pool.admit() if pool is not None else nullcontext()
+    with admission:
+        if scaler_notifier is not None and pool is not None and pool.queued >= SCALER_WAKEUP_QUEUE_DEPTH:
+            scaler_notifier.notify("queue_depth", queued=pool.queued)
+        return await infer(rows, state)
+
+async def predict_rows(rows: np.ndarray, state: ServingModel) -> np.ndarray:
+    """Serve cached rows from memory; only the cache misses take an inference slot"""
+    if prediction_cache is None:
+        return await infer_admitted(rows, state)
+
+    keys = prediction_cache.row_keys(state.version or "unknown", rows)
+    values, missing = prediction_cache.lookup(keys)
+
+    if missing:
+        computed = await infer_admitted(rows[missing], state)
+        prediction_cache.store([keys[i] for i in missing], computed)
+        for i, value in zip(missing, computed):
+            values[i] = value
+
+    return np.asarray(values)
 
 # ---------------- Startup ----------------
 @app.on_event("startup")
 def startup_event():
-    # Give MLflow time to initialize
-    time.sleep(5)
-    load_model()
+    global batcher, pool
+
+    if SERVING_MODE == "async":
+        pool = InferencePool(
+            workers=INFERENCE_WORKERS,
+            max_queue_depth=MAX_QUEUE_DEPTH,
+            kind=INFERENCE_POOL,
+            inflight_gauge=INFLIGHT_REQUESTS,
+            queued_gauge=QUEUED_REQUESTS,
+        )
+
+    # Load in the background; /ready reports 503 until a model is serving
+    threading.Thread(target=load_until_ready, name="model-loader", daemon=True).start()
+
+    if BATCHING_ENABLED:
+        batcher = MicroBatcher(
+            run_batch,
+            max_batch_size=MAX_BATCH_SIZE,
+            max_wait_ms=MAX_BATCH_WAIT_MS,
+            batch_size_histogram=BATCH_SIZE,
+            queue_wait_histogram=BATCH_QUEUE_WAIT,
+        )
+        batcher.start()
+
+@app.on_event("shutdown")
+def shutdown_event():
+    if batcher is not None:
+        batcher.stop()
+    if pool is not None:
+        pool.shutdown()
 
 # ---------------- Routes ----------------
 @app.get("/health")
 def health():
+    state = serving
     return {
-        "status": "healthy" if model else "degraded",
+        "status": "healthy" if state else "degraded",
         "model_name": MODEL_NAME,
-        "model_version": model_version,
+        "model_version": state.version if state else None,
         "model_alias": MODEL_ALIAS,
-        "model_loaded": model is not None,
+        "model_loaded": state is not None,
+        "reloading": reload_lock.locked(),
         "mlflow_uri": MLFLOW_TRACKING_URI,
         "s3_endpoint": os.environ.get('MLFLOW_S3_ENDPOINT_URL', 'not set')
     }
 
-@app.post("/predict")
-def predict(request: PredictionRequest, api_key: str = Depends(verify_api_key)):
-    if model is None:
+@app.get("/ready")
+def ready(response: Response):
+    """Readiness probe: only route traffic here once a model is serving"""
+    state = serving
+    if state is None:
+        response.status_code = 503
+        return {"ready": False}
+    return {"ready": True, "model_version": state.version}
+
+@app.post("/predict", openapi_extra={"requestBody": PREDICT_REQUEST_BODY})
+async def predict(request: Request, api_key: str = Depends(verify_api_key)):
+    # One snapshot per request: a concurrent swap can't mix model and version
+    state = serving
+    if state is None:
         raise HTTPException(status_code=503, detail="Model not loaded")
 
+    version = state.version or "unknown"
+    rows = await parse_inputs(request)
+
     start_time = time.time()
 
     try:
-        # Run inference
-        predictions = model.predict(request.inputs).tolist()
+        # Run inference off the event loop, coalesced with concurrent requests when batching is on
+        predictions = await predict_rows(rows, state)
 
         # Record latency
         latency = time.time() - start_time
-        REQUEST_LATENCY.labels(model_version=model_version or "unknown").observe(latency)
-        REQUEST_COUNT.labels(status="success", model_version=model_version or "unknown").inc()
+        REQUEST_LATENCY.labels(model_version=version).observe(latency)
+        REQUEST_COUNT.labels(status="success", model_version=version).inc()
+
+        if TENSOR_CONTENT_TYPE in request.headers.get("accept", ""):
+            content, headers = encode_tensor(predictions)
+            return Response(content=content, media_type=TENSOR_CONTENT_TYPE, headers=headers)
 
-        return {"predictions": predictions}
+        return {"predictions": predictions.tolist()}
+
+    except QueueFullError as e:
+        # Shed load immediately rather than letting latency pile up behind a deep queue
+        REQUEST_COUNT.labels(status="rejected", model_version=version).inc()
+        raise HTTPException(status_code=503, detail=f"Inference queue full: {e}", headers={"Retry-After": "1"})
 
     except Exception as e:
-        REQUEST_COUNT.labels(status="error", model_version=model_version or "unknown").inc()
+        REQUEST_COUNT.labels(status="error", model_version=version).inc()
         logger.error(f"Prediction error: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -182,10 +566,21 @@ def metrics():
     return Response(generate_latest(), media_type="text/plain")
 
 @app.post("/reload")
-def reload_model(api_key: str = Depends(verify_api_key)):
-    """Reload model (useful after new training)"""
+def reload_model(response: Response, wait: bool = False, api_key: str = Depends(verify_api_key)):
+    """Reload model (useful after new training); the current model keeps serving until the swap"""
+    if not wait:
+        if not reload_in_background():
+            raise HTTPException(status_code=409, detail="Reload already in progress")
+        response.status_code = 202
+        return {"status": "accepted", "message": f"Reloading {MODEL_NAME} ({MODEL_ALIAS}) in the background"}
+
+    if not reload_lock.acquire(blocking=False):
+        raise HTTPException(status_code=409, detail="Reload already in progress")
     try:
-        load_model()
-        return {"status": "success", "message": f"Model reloaded: {MODEL_NAME} v{model_version} ({MODEL_ALIAS})"}
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+        if not load_model():
+            raise HTTPException(status_code=500, detail="Model reload failed, previous model still serving")
+    finally:
+        reload_lock.release()
+
+    state = serving
+    return {"status": "success", "message": f"Model reloaded: {MODEL_NAME} v{state.version} ({MODEL_ALIAS})"}
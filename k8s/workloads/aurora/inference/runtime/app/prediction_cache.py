@@ -0,0 +1,96 @@
+import time
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Any, List, Tuple
+
+import numpy as np
+
+
+class PredictionCache:
+    """
+    Bounded LRU + TTL cache of per-row predictions.
+
+    Entries are keyed by (model_version, blake2b digest of the row bytes),
+    so a model swap never serves stale predictions even before `clear()`.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 100_000,
+        ttl_seconds: float = 300.0,
+        hit_counter=None,
+        miss_counter=None,
+        eviction_counter=None,
+    ):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.hit_counter = hit_counter
+        self.miss_counter = miss_counter
+        self.eviction_counter = eviction_counter
+
+        self._entries: "OrderedDict[Tuple[str, bytes], Tuple[Any, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @staticmethod
+    def row_keys(version: str, rows: np.ndarray) -> List[Tuple[str, bytes]]:
+        # Normalise dtype so float32 and float64 payloads of the same values share entries
+        rows = np.ascontiguousarray(rows, dtype=np.float64)
+        return [(version, hashlib.blake2b(row.tobytes(), digest_size=16).digest()) for row in rows]
+
+    def lookup(self, keys: List[Tuple[str, bytes]]) -> Tuple[List[Any], List[int]]:
+        """Return cached values (None for misses) and the indices of the missing rows"""
+        now = time.monotonic()
+        values: List[Any] = [None] * len(keys)
+        missing: List[int] = []
+        expired = 0
+
+        with self._lock:
+            for i, key in enumerate(keys):
+                entry = self._entries.get(key)
+                if entry is not None and now - entry[1] > self.ttl_seconds:
+                    del self._entries[key]
+                    expired += 1
+                    entry = None
+
+                if entry is None:
+                    missing.append(i)
+                else:
+                    self._entries.move_to_end(key)
+                    values[i] = entry[0]
+
+        if self.hit_counter is not None:
+            self.hit_counter.inc(len(keys) - len(missing))
+        if self.miss_counter is not None:
+            self.miss_counter.inc(len(missing))
+        if expired and self.eviction_counter is not None:
+            self.eviction_counter.labels(reason="ttl").inc(expired)
+
+        return values, missing
+
+    def store(self, keys: List[Tuple[str, bytes]], values) -> None:
+        now = time.monotonic()
+        evicted = 0
+
+        with self._lock:
+            for key, value in zip(keys, values):
+                self._entries[key] = (value, now)
+                self._entries.move_to_end(key)
+
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                evicted += 1
+
+        if evicted and self.eviction_counter is not None:
+            self.eviction_counter.labels(reason="lru").inc(evicted)
+
+    def clear(self) -> None:
+        with self._lock:
+            dropped = len(self._entries)
+            self._entries.clear()
+
+        if dropped and self.eviction_counter is not None:
+            self.eviction_counter.labels(reason="reload").inc(dropped)
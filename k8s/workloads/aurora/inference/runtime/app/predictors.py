@@ -0,0 +1,83 @@
+import logging
+from typing import Optional
+
+import numpy as np
+
+from app.tree_arrays import FlatTreeEnsemble
+
+logger = logging.getLogger("aurora-inference")
+
+BACKENDS = ("sklearn", "compiled")
+
+
+class CompiledTreePredictor:
+    """
+    Serves a tree ensemble from compiled flat arrays.
+
+    The vectorized traversal wins on small batches, where sklearn's
+    per-tree Python overhead dominates. Batches larger than
+    `crossover_rows` go to the original sklearn model, whose Cython
+    traversal is faster there.
+    """
+
+    def __init__(self, ensemble: FlatTreeEnsemble, fallback=None, crossover_rows: int = 256):
+        self.ensemble = ensemble
+        self.fallback = fallback
+        self.crossover_rows = crossover_rows
+        self.n_features_in_ = ensemble.n_features_in_
+
+    def predict(self, X) -> np.ndarray:
+        if self.fallback is not None and len(X) > self.crossover_rows:
+            return self.fallback.predict(X)
+        return self.ensemble.predict(X)
+
+
+def validation_rows(ensemble: FlatTreeEnsemble, n_rows: int = 256) -> np.ndarray:
+    """Synthetic rows spread across each feature's split thresholds, so most branches get exercised"""
+    rng = np.random.RandomState(0)
+    rows = np.zeros((n_rows, ensemble.n_features_in_))
+    is_split = np.isfinite(ensemble.threshold)
+
+    for j in range(ensemble.n_features_in_):
+        thresholds = ensemble.threshold[is_split & (ensemble.feature == j)]
+        if len(thresholds):
+            low, high = thresholds.min(), thresholds.max()
+            margin = max(high - low, 1.0) * 0.1
+            rows[:, j] = rng.uniform(low - margin, high + margin, n_rows)
+
+    return rows
+
+
+def compile_model(model, rtol: float = 1e-6, atol: float = 1e-8) -> FlatTreeEnsemble:
+    """Flatten a sklearn tree ensemble and check it reproduces model.predict; raises ValueError otherwise"""
+    ensemble = FlatTreeEnsemble.from_sklearn(model)
+    probe = validation_rows(ensemble)
+
+    expected = model.predict(probe)
+    actual = ensemble.predict(probe)
+    if ensemble.is_classifier:
+        matches = np.array_equal(expected, actual)
+    else:
+        matches = np.allclose(expected, actual, rtol=rtol, atol=atol)
+    if not matches:
+        raise ValueError("compiled predictions differ from model.predict")
+
+    return ensemble
+
+
+def select_predictor(model, backend: str, crossover_rows: int = 256, version: Optional[str] = None):
+    """Wrap `model` in the requested backend, falling back to the plain sklearn model"""
+    if backend == "sklearn" or isinstance(model, FlatTreeEnsemble):
+        return model
+    if backend != "compiled":
+        logger.warning(f"Unknown predictor backend '{backend}', expected one of {BACKENDS}; using sklearn")
+        return model
+
+    try:
+        ensemble = compile_model(model)
+    except ValueError as e:
+        logger.warning(f"Compiled predictor unavailable for v{version}: {e}; using sklearn")
+        return model
+
+    logger.info(f"Compiled v{version} into {ensemble.n_trees} trees / {len(ensemble.feature)} nodes")
+    return CompiledTreePredictor(ensemble, fallback=model, crossover_rows=crossover_rows)
@@ -0,0 +1,46 @@
+import json
+import time
+import logging
+import threading
+import urllib.request
+
+logger = logging.getLogger("aurora-inference")
+
+
+class ScalerNotifier:
+    """
+    Fire-and-forget wake-up calls to the NimbusOps scaler.
+
+    At most one POST per `cooldown_seconds`, sent from a short-lived
+    thread, so a request that trips the threshold never waits on the
+    scaler.
+    """
+
+    def __init__(self, url: str, cooldown_seconds: float = 5.0, timeout_seconds: float = 1.0):
+        self.url = url
+        self.cooldown_seconds = cooldown_seconds
+        self.timeout_seconds = timeout_seconds
+        self._lock = threading.Lock()
+        self._last_sent = float("-inf")
+
+    def notify(self, reason: str, **details):
+        now = time.monotonic()
+        with self._lock:
+            if now - self._last_sent < self.cooldown_seconds:
+                return
+            self._last_sent = now
+
+        payload = {"source": "inference", "reason": reason, **details}
+        threading.Thread(target=self._post, args=(payload,), daemon=True).start()
+
+    def _post(self, payload: dict):
+        request = urllib.request.Request(
+            self.url,
+            data=json.dumps(payload).encode(),
+            headers={"Content-Type": "application/json"},
+            method="POST",
+        )
+        try:
+            urllib.request.urlopen(request, timeout=self.timeout_seconds).close()
+        except OSError as e:
+            logger.warning(f"Scaler wake-up to {self.url} failed: {e}")
@@ -0,0 +1,212 @@
+import json
+from pathlib import Path
+from typing import Optional
+
+import numpy as np
+
+META_FILE = "meta.json"
+ARRAYS = ("feature", "threshold", "left", "right", "value", "roots")
+# Saved only for trees that carry them (sklearn >= 1.3)
+OPTIONAL_ARRAYS = ("missing_left",)
+
+
+class FlatTreeEnsemble:
+    """
+    A fitted sklearn tree ensemble flattened into contiguous node arrays.
+
+    All trees share one set of `feature`, `threshold`, `left`, `right` and
+    `value` arrays; `roots` holds each tree's first node. Leaves point at
+    themselves, so a fixed number of traversal steps lands every row on
+    its leaf. Saved as plain `.npy` files, the arrays can be memory-mapped
+    read-only and shared between every worker on a node.
+
+    `missing_left` marks the nodes that send a NaN feature left, as
+    sklearn's `missing_go_to_left` does; without it NaN goes left like
+    any failed `>` comparison.
+    """
+
+    def __init__(
+        self,
+        feature: np.ndarray,
+        threshold: np.ndarray,
+        left: np.ndarray,
+        right: np.ndarray,
+        value: np.ndarray,
+        roots: np.ndarray,
+        n_features: int,
+        max_depth: int,
+        classes: Optional[np.ndarray] = None,
+        missing_left: Optional[np.ndarray] = None,
+    ):
+        self.feature = feature
+        self.threshold = threshold
+        self.left = left
+        self.right = right
+        self.value = value
+        self.roots = roots
+        self.n_features_in_ = n_features
+        self.max_depth = max_depth
+        self.classes_ = classes
+        self.missing_left = missing_left
+        self.source: Optional[Path] = None
+
+    def __reduce__(self):
+        # Memory-mapped ensembles travel to worker processes as their path, not a copy of the arrays
+        if self.source is not None:
+            return (FlatTreeEnsemble.load, (str(self.source), True))
+        return super().__reduce__()
+
+    @property
+    def n_trees(self) -> int:
+        return len(self.roots)
+
+    @property
+    def is_classifier(self) -> bool:
+        return self.classes_ is not None
+
+    # ---------------- Conversion ----------------
+    @classmethod
+    def from_sklearn(cls, model) -> "FlatTreeEnsemble":
+        """Flatten a single-output DecisionTree/RandomForest/ExtraTrees model"""
+        estimators = getattr(model, "estimators_", None)
+        if estimators is None:
+            estimators = [model]
+        if not estimators or not all(hasattr(est, "tree_") for est in estimators):
+            raise ValueError(f"{type(model).__name__} is not a tree ensemble")
+        if getattr(model, "n_outputs_", 1) != 1:
+            raise ValueError("Only single-output tree models can be flattened")
+
+        classes = getattr(model, "classes_", None)
+        features, thresholds, lefts, rights, values, roots, missing = [], [], [], [], [], [], []
+        offset = 0
+        max_depth = 0
+
+        for est in estimators:
+            tree = est.tree_
+            n_nodes = tree.node_count
+            node_ids = np.arange(offset, offset + n_nodes, dtype=np.int32)
+            is_leaf = tree.children_left == -1
+
+            features.append(np.where(is_leaf, 0, tree.feature).astype(np.int32))
+            thresholds.append(np.where(is_leaf, np.inf, tree.threshold))
+            lefts.append(np.where(is_leaf, node_ids, tree.children_left + offset).astype(np.int32))
+            rights.append(np.where(is_leaf, node_ids, tree.children_right + offset).astype(np.int32))
+            missing_go_to_left = getattr(tree, "missing_go_to_left", None)
+            if missing_go_to_left is not None:
+                missing.append(np.where(is_leaf, 0, missing_go_to_left).astype(np.uint8))
+
+            if classes is None:
+                values.append(tree.value[:, 0, 0])
+            else:
+                # Per-tree class probabilities, as averaged by predict_proba
+                counts = tree.value[:, 0, :]
+                values.append(counts / counts.sum(axis=1, keepdims=True))
+
+            roots.append(offset)
+            max_depth = max(max_depth, tree.max_depth)
+            offset += n_nodes
+
+        return cls(
+            feature=np.concatenate(features),
+            threshold=np.concatenate(thresholds).astype(np.float64),
+            left=np.concatenate(lefts),
+            right=np.concatenate(rights),
+            value=np.concatenate(values).astype(np.float64),
+            roots=np.asarray(roots, dtype=np.int32),
+            n_features=int(model.n_features_in_),
+            max_depth=int(max_depth),
+            classes=classes,
+            missing_left=np.concatenate(missing) if len(missing) == len(estimators) else None,
+        )
+
+    # ---------------- Storage ----------------
+    def save(self, directory):
+        directory = Path(directory)
+        directory.mkdir(parents=True, exist_ok=True)
+
+        for name in ARRAYS + OPTIONAL_ARRAYS:
+            if getattr(self, name) is None:
+                continue
+            np.save(directory / f"{name}.npy", np.ascontiguousarray(getattr(self, name)))
+
+        meta = {"n_features": self.n_features_in_, "max_depth": self.max_depth}
+        if self.classes_ is not None:
+            meta["classes"] = self.classes_.tolist()
+        (directory / META_FILE).write_text(json.dumps(meta))
+
+    @classmethod
+    def load(cls, directory, mmap: bool = True) -> "FlatTreeEnsemble":
+        """Load the arrays, memory-mapped read-only by default so workers share page cache"""
+        directory = Path(directory)
+        meta = json.loads((directory / META_FILE).read_text())
+        mmap_mode = "r" if mmap else None
+        arrays = {name: np.load(directory / f"{name}.npy", mmap_mode=mmap_mode) for name in ARRAYS}
+        for name in OPTIONAL_ARRAYS:
+            if (directory / f"{name}.npy").exists():
+                arrays[name] = np.load(directory / f"{name}.npy", mmap_mode=mmap_mode)
+        classes = np.asarray(meta["classes"]) if "classes" in meta else None
+
+        ensemble = cls(**arrays, n_features=meta["n_features"], max_depth=meta["max_depth"], classes=classes)
+        if mmap:
+            ensemble.source = directory
+        return ensemble
+
+    # ---------------- Inference ----------------
+    def leaves(self, X) -> np.ndarray:
+        """Leaf node reached by every (tree, row) pair, shape (n_trees * n_rows,), tree-major"""
+        # sklearn compares float32 features against float64 thresholds
+        X = np.ascontiguousarray(X, dtype=np.float32)
+        n_rows, n_cols = X.shape
+        flat_x = X.ravel()
+        # NaN routing costs an extra gather per level, so only batches that contain NaN pay for it
+        route_missing = self.missing_left is not None and np.isnan(flat_x).any()
+
+        # Walk every tree for every row at once, one tree level per step
+        current = np.repeat(self.roots.astype(np.intp), n_rows)
+        row_base = np.tile(np.arange(n_rows, dtype=np.intp) * n_cols, self.n_trees)
+        finished, active = None, None
+
+        for _ in range(self.max_depth):
+            left = self.left.take(current)
+            at_leaf = left == current
+            n_leaves = np.count_nonzero(at_leaf)
+            if n_leaves == len(current):
+                break
+
+            # Once enough paths have ended, park them and keep walking only the rest
+            if n_leaves > len(current) // 4:
+                keep = ~at_leaf
+                if active is None:
+                    finished, active = current, np.flatnonzero(keep)
+                else:
+                    finished[active] = current
+                    active = active[keep]
+                current, left, row_base = current[keep], left[keep], row_base[keep]
+
+            x = flat_x.take(row_base + self.feature.take(current))
+            go_right = x > self.threshold.take(current)
+            if route_missing:
+                go_right |= np.isnan(x) & (self.missing_left.take(current) == 0)
+            current = np.where(go_right, self.right.take(current), left)
+
+        if active is None:
+            return current
+        finished[active] = current
+        return finished
+
+    def predict_value(self, X, chunk_rows: int = 16384) -> np.ndarray:
+        """Mean leaf value over all trees (class probabilities for classifiers)"""
+        X = np.asarray(X)
+        out = []
+        # Bound the (n_trees x rows) working set for very large batches
+        for start in range(0, len(X), chunk_rows):
+            chunk = X[start:start + chunk_rows]
+            values = self.value[self.leaves(chunk)]
+            out.append(values.reshape((self.n_trees, len(chunk)) + self.value.shape[1:]).mean(axis=0))
+        return np.concatenate(out) if len(out) != 1 else out[0]
+
+    def predict(self, X) -> np.ndarray:
+        values = self.predict_value(X)
+        if self.classes_ is not None:
+            return self.classes_[np.argmax(values, axis=1)]
+        return values
@@ -1,12 +1,58 @@
-from kubernetes import client, config
+import os
+import threading
+from functools import lru_cache
+
+# API server to talk to instead of the in-cluster/kubeconfig one, e.g. a local fake
+KUBE_API_URL = os.getenv("KUBE_API_URL", "")
+
+_lock = threading.Lock()
+_api_client = None
 
 def load_kube_config():
+    from kubernetes import config
+
     try:
         config.load_incluster_config()
     except Exception:
         config.load_kube_config()
 
-load_kube_config()
+def api_client():
+    """
+    The process-wide ApiClient, created on first use. Importing this module
+    neither imports kubernetes nor reads credentials, so the API starts
+    fast and outside a cluster; every API object shares one connection pool.
+    """
+    global _api_client
+    if _api_client is None:
+        with _lock:
+            if _api_client is None:
+                from kubernetes import client
+
+                if KUBE_API_URL:
+                    configuration = client.Configuration()
+                    configuration.host = KUBE_API_URL
+                else:
+                    load_kube_config()
+                    configuration = client.Configuration.get_default_copy()
+                _api_client = client.ApiClient(configuration)
+    return _api_client
+
+def use_api_client(api):
+    """Swap in another ApiClient (e.g. one pointed at a fake API server)"""
+    global _api_client
+    with _lock:
+        _api_client = api
+    core_v1.cache_clear()
+    storage_v1.cache_clear()
+
+@lru_cache(maxsize=None)
+def core_v1():
+    from kubernetes import client
+
+    return client.CoreV1Api(api_client())
+
+@lru_cache(maxsize=None)
+def storage_v1():
+    from kubernetes import client
 
-core_v1 = client.CoreV1Api()
-storage_v1 = client.StorageV1Api()
+    return client.StorageV1Api(api_client())
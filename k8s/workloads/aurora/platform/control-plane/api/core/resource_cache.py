@@ -0,0 +1,145 @@
+import os
+import json
+import time
+import hashlib
+import threading
+from typing import Any, Callable, Dict, NamedTuple, Optional
+
+from fastapi import HTTPException, Request, Response
+
+# Server-side timeout of one watch request; the watch resumes from the last resourceVersion
+WATCH_TIMEOUT_SECONDS = int(os.getenv("WATCH_TIMEOUT_SECONDS", "300"))
+WATCH_RETRY_MAX_SECONDS = float(os.getenv("WATCH_RETRY_MAX_SECONDS", "30"))
+# How long a request waits for the first list before answering 503
+CACHE_SYNC_TIMEOUT_SECONDS = float(os.getenv("CACHE_SYNC_TIMEOUT_SECONDS", "10"))
+
+class Snapshot(NamedTuple):
+    body: bytes
+    etag: str
+
+class WatchedList:
+    """
+    In-memory view of one cluster-scoped resource kept current by a
+    list + watch. The JSON body and its strong ETag (a hash of the body)
+    are rendered once per change, so requests are served from memory and a
+    watch event that leaves the view unchanged (e.g. a node heartbeat)
+    keeps the ETag. The watch resumes from the last resourceVersion,
+    bookmarks included, and re-lists on 410 Gone.
+    """
+
+    def __init__(self, name: str, list_func: Callable[[], Callable], view: Callable[[Any], Dict[str, Any]]):
+        self.name = name
+        self.list_func = list_func  # returns the API's list method, e.g. lambda: core_v1().list_node
+        self.view = view
+        self._items: Dict[str, Dict[str, Any]] = {}
+        self._snapshot: Optional[Snapshot] = None
+        self._synced = threading.Event()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._watch = None
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, daemon=True, name=f"watch-{self.name}")
+            self._thread.start()
+        return self
+
+    def stop(self, timeout: float = 1.0):
+        self._stop.set()
+        if self._watch is not None:
+            self._watch.stop()
+        if self._thread is not None:
+            # A watch blocked on the API server ends at its own timeout; don't hold shutdown for it
+            self._thread.join(timeout)
+
+    def snapshot(self) -> Optional[Snapshot]:
+        return self._snapshot
+
+    def wait_snapshot(self, timeout: float = CACHE_SYNC_TIMEOUT_SECONDS) -> Optional[Snapshot]:
+        self.start()
+        self._synced.wait(timeout)
+        return self._snapshot
+
+    # ---------------- List + watch ----------------
+    def _render(self):
+        body = json.dumps([self._items[name] for name in sorted(self._items)]).encode()
+        etag = f'"{hashlib.sha256(body).hexdigest()[:32]}"'
+        if self._snapshot is None or self._snapshot.etag != etag:
+            self._snapshot = Snapshot(body, etag)
+
+    def _list(self) -> str:
+        listing = self.list_func()()
+        self._items = {item.metadata.name: self.view(item) for item in listing.items}
+        self._render()
+        self._synced.set()
+        return listing.metadata.resource_version
+
+    def _run(self):
+        from kubernetes import watch
+        from kubernetes.client.rest import ApiException
+
+        resource_version = None
+        delay = 1.0
+        while not self._stop.is_set():
+            try:
+                if resource_version is None:
+                    resource_version = self._list()
+
+                self._watch = watch.Watch()
+                for event in self._watch.stream(
+                    self.list_func(),
+                    resource_version=resource_version,
+                    allow_watch_bookmarks=True,
+                    timeout_seconds=WATCH_TIMEOUT_SECONDS,
+                    _request_timeout=WATCH_TIMEOUT_SECONDS + 30,
+                ):
+                    name = event["object"].metadata.name
+                    if event["type"] in ("ADDED", "MODIFIED"):
+                        self._items[name] = self.view(event["object"])
+                    elif event["type"] == "DELETED":
+                        self._items.pop(name, None)
+                    else:
+                        continue
+                    self._render()
+                resource_version = self._watch.resource_version or resource_version
+                delay = 1.0
+            except ApiException as e:
+                if e.status == 410:
+                    resource_version = None
+                    continue
+                print(f"{self.name} watch failed ({e.status}), retrying in {delay:.0f}s")
+                self._stop.wait(delay)
+                delay = min(delay * 2, WATCH_RETRY_MAX_SECONDS)
+            except Exception as e:
+                print(f"{self.name} watch failed: {e}, retrying in {delay:.0f}s")
+                self._stop.wait(delay)
+                delay = min(delay * 2, WATCH_RETRY_MAX_SECONDS)
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """If-None-Match uses weak comparison: W/ prefixes are ignored, * matches anything"""
+    if not if_none_match:
+        return False
+    candidates = [tag.strip() for tag in if_none_match.split(",")]
+    return "*" in candidates or etag in (tag[2:] if tag.startswith("W/") else tag for tag in candidates)
+
+def sync_caches(caches, timeout: float = CACHE_SYNC_TIMEOUT_SECONDS):
+    """Start every cache and wait, once and in parallel, for their initial lists"""
+    for cache in caches:
+        cache.start()
+    deadline = time.monotonic() + timeout
+    for cache in caches:
+        if cache.wait_snapshot(max(0.0, deadline - time.monotonic())) is None:
+            print(f"{cache.name} not synced after {timeout:g}s, answering 503 until it is")
+
+async def cached_response(cache: WatchedList, request: Request) -> Response:
+    """Serve a WatchedList from memory, 304 when the client already has this version"""
+    snapshot = cache.snapshot()
+    if snapshot is None:
+        # Only until the first list completes; requests never wait for it
+        cache.start()
+        raise HTTPException(status_code=503, detail=f"{cache.name} not available yet", headers={"Retry-After": "1"})
+
+    headers = {"ETag": snapshot.etag, "Cache-Control": "no-cache"}
+    if etag_matches(request.headers.get("if-none-match"), snapshot.etag):
+        return Response(status_code=304, headers=headers)
+    return Response(snapshot.body, media_type="application/json", headers=headers)
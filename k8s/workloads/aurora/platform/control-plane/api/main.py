@@ -1,4 +1,6 @@
 from fastapi import FastAPI, Depends
+from starlette.concurrency import run_in_threadpool
+from api.core.resource_cache import sync_caches
 from api.routers import health, platform, storage, cluster, models
 from api.security import api_key_auth
 
@@ -17,3 +19,17 @@ app.include_router(storage.router, dependencies=[Depends(api_key_auth)])
 app.include_router(cluster.router, dependencies=[Depends(api_key_auth)])
 app.include_router(models.router, dependencies=[Depends(api_key_auth)])
 
+
+CACHES = (cluster.nodes_cache, storage.storage_classes_cache)
+
+
+@app.on_event("startup")
+async def startup_event():
+    # List + watch in the background; startup waits (bounded) for the initial lists, requests never do
+    await run_in_threadpool(sync_caches, CACHES)
+
+
+@app.on_event("shutdown")
+def shutdown_event():
+    for cache in CACHES:
+        cache.stop()
@@ -1,15 +1,23 @@
-from fastapi import APIRouter
+from fastapi import APIRouter, Request
 from api.core.k8s_client import core_v1
+from api.core.resource_cache import WatchedList, cached_response
 
 router = APIRouter()
 
+def node_view(node):
+    # Ready / NotReady / Unknown, as kubectl shows it; conditions are unordered and may be empty
+    ready = next((c for c in (node.status and node.status.conditions) or [] if c.type == "Ready"), None)
+    if ready is None or ready.status == "Unknown":
+        status = "Unknown"
+    else:
+        status = "Ready" if ready.status == "True" else "NotReady"
+    return {
+        "name": node.metadata.name,
+        "status": status
+    }
+
+nodes_cache = WatchedList("nodes", lambda: core_v1().list_node, node_view)
+
 @router.get("/cluster/nodes")
-def list_nodes():
-    nodes = core_v1.list_node()
-    return [
-        {
-            "name": node.metadata.name,
-            "status": node.status.conditions[-1].type
-        }
-        for node in nodes.items
-    ]
+async def list_nodes(request: Request):
+    return await cached_response(nodes_cache, request)
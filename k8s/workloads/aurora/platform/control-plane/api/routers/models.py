@@ -1,13 +1,64 @@
-from fastapi import APIRouter, HTTPException, Depends
-from fastapi.responses import StreamingResponse
+from fastapi import APIRouter, HTTPException, Depends, Request, Response
+from fastapi.responses import FileResponse
 from pathlib import Path
+import os
 import json
+import hashlib
+import threading
+from api.core.resource_cache import etag_matches
 from api.security import api_key_auth
 
 router = APIRouter(prefix="/models", tags=["models"])
 
 ROOT = Path("/shared-models/aurora")
 
+# Read size per chunk when the server streams the file itself (no zero-copy pathsend)
+ARTIFACT_CHUNK_BYTES = int(os.getenv("ARTIFACT_CHUNK_BYTES", str(1024 * 1024)))
+
+class ArtifactResponse(FileResponse):
+    """
+    FileResponse with larger chunks. Range, If-Range and multipart ranges
+    come from Starlette; servers with the ASGI pathsend extension send the
+    file zero-copy.
+    """
+    chunk_size = ARTIFACT_CHUNK_BYTES
+
+# path -> ((inode, size, mtime_ns), etag); artifacts are hashed once per change
+_digests = {}
+# path -> [lock, holders]; an entry lives only while someone is hashing or waiting on that path
+_digest_locks = {}
+_digest_lock = threading.Lock()
+
+def content_etag(file: Path, st: os.stat_result) -> str:
+    """Strong ETag from the SHA-256 of the file, cached until the file changes"""
+    key = (st.st_ino, st.st_size, st.st_mtime_ns)
+    cached = _digests.get(file)
+    if cached is not None and cached[0] == key:
+        return cached[1]
+
+    # Parallel range requests for a new artifact hash it once, not once each
+    with _digest_lock:
+        entry = _digest_locks.setdefault(file, [threading.Lock(), 0])
+        entry[1] += 1
+    try:
+        with entry[0]:
+            cached = _digests.get(file)
+            if cached is not None and cached[0] == key:
+                return cached[1]
+
+            digest = hashlib.sha256()
+            with file.open("rb") as f:
+                for chunk in iter(lambda: f.read(ARTIFACT_CHUNK_BYTES), b""):
+                    digest.update(chunk)
+            etag = f'"{digest.hexdigest()}"'
+            _digests[file] = (key, etag)
+            return etag
+    finally:
+        with _digest_lock:
+            entry[1] -= 1
+            if not entry[1]:
+                del _digest_locks[file]
+
 def resolve(model: str, ref: str) -> Path:
     base = ROOT / model
 
@@ -41,20 +92,30 @@ def metadata(
 
     return json.loads(meta.read_text())
 
-@router.get("/{model}/{ref}/artifact")
+@router.api_route("/{model}/{ref}/artifact", methods=["GET", "HEAD"])
 def artifact(
     model: str,
     ref: str,
+    request: Request,
     _=Depends(api_key_auth)
 ):
     path = resolve(model, ref)
     file = path / "model.pkl"
 
-    if not file.exists():
+    try:
+        st = file.stat()
+    except FileNotFoundError:
         raise HTTPException(status_code=500, detail="Model artifact missing")
 
-    return StreamingResponse(
-        file.open("rb"),
-        media_type="application/octet-stream"
+    etag = content_etag(file, st)
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers={"ETag": etag})
+
+    # HEAD gives parallel downloaders the size; Range/If-Range use the same strong ETag
+    return ArtifactResponse(
+        file,
+        media_type="application/octet-stream",
+        headers={"ETag": etag, "Cache-Control": "no-cache"},
+        stat_result=st,
     )
 
@@ -1,16 +1,18 @@
-from fastapi import APIRouter
+from fastapi import APIRouter, Request
 from api.core.k8s_client import storage_v1
+from api.core.resource_cache import WatchedList, cached_response
 
 router = APIRouter()
 
+def storage_class_view(sc):
+    return {
+        "name": sc.metadata.name,
+        "provisioner": sc.provisioner,
+        "reclaimPolicy": sc.reclaim_policy
+    }
+
+storage_classes_cache = WatchedList("storageclasses", lambda: storage_v1().list_storage_class, storage_class_view)
+
 @router.get("/storage/classes")
-def list_storage_classes():
-    scs = storage_v1.list_storage_class()
-    return [
-        {
-            "name": sc.metadata.name,
-            "provisioner": sc.provisioner,
-            "reclaimPolicy": sc.reclaim_policy
-        }
-        for sc in scs.items
-    ]
+async def list_storage_classes(request: Request):
+    return await cached_response(storage_classes_cache, request)
@@ -1,4 +1,5 @@
-from kubernetes import client, watch, config
+from kubernetes import watch
+from aurora_operator.k8s_client import custom_objects
 from aurora_operator.training_job import create_training_job
 from aurora_operator.status import update_status
 
@@ -10,13 +11,12 @@ NAMESPACE = "aurora-system"
 
 def run_controller():
     try:
-        config.load_incluster_config()
-        print("✅ Loaded in-cluster Kubernetes config")
+        api = custom_objects()
+        print("✅ Loaded Kubernetes config")
     except Exception as e:
-        print(f"❌ Failed to load in-cluster config: {e}")
+        print(f"❌ Failed to load Kubernetes config: {e}")
         return
 
-    api = client.CustomObjectsApi()
     w = watch.Watch()
 
     print("🚀 AURORA MLTrainingJob controller started")
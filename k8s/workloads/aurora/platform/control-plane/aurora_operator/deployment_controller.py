@@ -1,5 +1,5 @@
 import kopf
-from kubernetes import client
+from aurora_operator.k8s_client import custom_objects
 from datetime import datetime
 
 GROUP = "aurora.io"
@@ -8,7 +8,7 @@ PLURAL = "mldeployments"
 
 
 def update_status(namespace, name, status):
-    api = client.CustomObjectsApi()
+    api = custom_objects()
 
     body = {
         "status": status
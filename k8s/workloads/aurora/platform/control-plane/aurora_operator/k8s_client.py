@@ -0,0 +1,45 @@
+import os
+import threading
+from functools import lru_cache
+
+from kubernetes import client, config
+
+# API server to talk to instead of the in-cluster/kubeconfig one, e.g. a local fake
+KUBE_API_URL = os.getenv("KUBE_API_URL", "")
+
+_lock = threading.Lock()
+_api_client = None
+
+def api_client() -> client.ApiClient:
+    """The operator's one ApiClient (and connection pool), configured on first use"""
+    global _api_client
+    if _api_client is None:
+        with _lock:
+            if _api_client is None:
+                if KUBE_API_URL:
+                    configuration = client.Configuration()
+                    configuration.host = KUBE_API_URL
+                else:
+                    try:
+                        config.load_incluster_config()
+                    except config.ConfigException:
+                        config.load_kube_config()
+                    configuration = client.Configuration.get_default_copy()
+                _api_client = client.ApiClient(configuration)
+    return _api_client
+
+def use_api_client(api: client.ApiClient):
+    """Swap in another ApiClient (e.g. one pointed at a fake API server)"""
+    global _api_client
+    with _lock:
+        _api_client = api
+    custom_objects.cache_clear()
+    batch_v1.cache_clear()
+
+@lru_cache(maxsize=None)
+def custom_objects() -> client.CustomObjectsApi:
+    return client.CustomObjectsApi(api_client())
+
+@lru_cache(maxsize=None)
+def batch_v1() -> client.BatchV1Api:
+    return client.BatchV1Api(api_client())
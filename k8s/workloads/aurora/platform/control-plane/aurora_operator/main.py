@@ -1,9 +1,12 @@
 import kopf
-from kubernetes import config
 import aurora_operator.deployment_controller
+from aurora_operator.k8s_client import api_client
 from aurora_operator.training_job import create_training_job
 
-config.load_incluster_config()
+@kopf.on.startup()
+def configure(**kwargs):
+    # Credentials are loaded once kopf starts, not at import
+    api_client()
 
 @kopf.on.create("aurora.io", "v1alpha1", "mltrainingjobs")
 def on_create(spec, meta, namespace, **kwargs):
@@ -1,8 +1,8 @@
-from kubernetes import client
+from aurora_operator.k8s_client import custom_objects
 
 
 def update_status(cr, phase):
-    api = client.CustomObjectsApi()
+    api = custom_objects()
 
     name = cr["metadata"]["name"]
     namespace = cr["metadata"]["namespace"]
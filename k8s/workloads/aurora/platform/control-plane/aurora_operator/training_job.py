@@ -1,9 +1,10 @@
 from kubernetes import client
 from kubernetes.client.rest import ApiException
+from aurora_operator.k8s_client import batch_v1
 import datetime
 
 def create_training_job(cr):
-    batch = client.BatchV1Api()
+    batch = batch_v1()
 
     name = cr["metadata"]["name"]
     namespace = cr["metadata"]["namespace"]